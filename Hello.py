@@ -1,6 +1,11 @@
 import streamlit as st
 from streamlit.logger import get_logger
 import pandas as pd
+import figure_cache
+import metrics
+import refresher
+import sources
+import utils
 from price_models import get_dataframe, create_transformed_cycle
 from norm_mvrv import get_norm_mvrv_df, create_norm_mvrv_plot
 
@@ -10,27 +15,41 @@ st.set_page_config(initial_sidebar_state="expanded", page_title="OnChain Data",
 LOGGER = get_logger(__name__)
 
 
+def load_transformed_cycle():
+    return create_transformed_cycle(get_dataframe())
+
+
+def load_norm_mvrv_plot():
+    return create_norm_mvrv_plot(get_norm_mvrv_df())
+
+
 def run():
 
-    st.title("On-Chain Data")
+    # Keep every source warm in the background; this page only waits on
+    # the two it draws
+    refresher.start()
 
-    df_cycles = get_dataframe()
+    x_range = utils.viewport()
+
+    st.title("On-Chain Data")
 
     st.subheader(f"Normalized Transformed Cycle Bands")
     # Call the function to create the plot
-    fig_transf_cycles = create_transformed_cycle(df_cycles)
+    fig_transf_cycles = load_transformed_cycle()
 
     # Show the figure
-    st.plotly_chart(fig_transf_cycles, use_container_width=True)
-
-    df_mvrv = get_norm_mvrv_df()
+    utils.plotly_chart(fig_transf_cycles, x_range, use_container_width=True)
 
     st.subheader(f"Range Adjusted MVRV")
     # Call the function to create the plot
-    fig_mvrv = create_norm_mvrv_plot(df_mvrv)
+    fig_mvrv = load_norm_mvrv_plot()
 
     # Show the figure
-    st.plotly_chart(fig_mvrv, use_container_width=True)
+    utils.plotly_chart(fig_mvrv, x_range, use_container_width=True)
+
+    LOGGER.info("Figure cache: %s", figure_cache.stats())
+    LOGGER.info("Metric timings: %s", metrics.timings())
+    LOGGER.info("Source digests: %s", sources.digests())
 
 
 
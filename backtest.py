@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import aviv_nupl
+import moments
+import norm_mvrv
+import price_models
+import sth_nupl
+
+# Worker processes for sweep(); None lets the executor use one per core
+MAX_WORKERS = int(os.environ["ONCHAIN_BACKTEST_WORKERS"]) if "ONCHAIN_BACKTEST_WORKERS" in os.environ else None
+
+# (buy, sell) threshold pairs per task; enough to amortise the per-task overhead
+CHUNK_SIZE = 256
+
+
+def signal_frame():
+    """Return BTC Price and every indicator signal on one daily index from 2012.
+
+    Band strategies are expressed as expanding z-scores, so crossing
+    'Mean + kσ' is the z-score crossing k and σ multipliers are thresholds.
+    """
+    cycles = price_models.get_dataframe()
+    frame = cycles[['BTC Price', 'Adjusted Normalized Price']].copy()
+    frame['Adjusted_MVRV'] = norm_mvrv.get_norm_mvrv_df()['Adjusted_MVRV']
+
+    # The same running moments (and persisted state) the charts' bands use
+    nupl = sth_nupl.get_dataframe_nupl()
+    young_nupl = nupl.loc[nupl.index.year >= 2012, 'Young-NUPL']
+    mean, std = moments.expanding_mean_std(young_nupl, name='sth_nupl.Young-NUPL')
+    frame['STH NUPL σ'] = pd.Series((young_nupl.to_numpy() - mean) / std, index=young_nupl.index)
+
+    aviv = aviv_nupl.aviv_nupl_df()['AVIV NUPL']
+    mean, std = moments.expanding_mean_std(aviv, name='aviv_nupl.AVIV NUPL')
+    frame['AVIV NUPL σ'] = pd.Series((aviv.to_numpy() - mean) / std, index=aviv.index)
+
+    return frame
+
+
+def simulate(price, signal, buy, sell):
+    """Return the statistics of every (buy, sell) threshold pair on one signal.
+
+    Each strategy goes long at the close the signal falls below buy and back
+    to cash at the close it rises above sell; days without a signal keep the
+    position. buy and sell are arrays with one entry per strategy.
+    """
+    buy = np.asarray(buy, dtype=float)
+    sell = np.asarray(sell, dtype=float)
+    n = len(price)
+
+    # The position is path dependent, so walk the days once for all strategies together
+    positions = np.zeros((len(buy), n), dtype=bool)
+    held = np.zeros(len(buy), dtype=bool)
+    for day, value in enumerate(signal):
+        if value == value:
+            held = np.where(held, value <= sell, value < buy)
+        positions[:, day] = held
+
+    # A position taken at today's close earns tomorrow's return
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.diff(np.log(price), prepend=np.nan)
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    equity = np.cumsum(positions[:, :-1] * returns[1:], axis=1)
+    drawdown = equity - np.maximum.accumulate(equity, axis=1)
+
+    return dict(
+        buy=buy,
+        sell=sell,
+        total_return=np.expm1(equity[:, -1]) if n > 1 else np.zeros(len(buy)),
+        max_drawdown=np.expm1(drawdown.min(axis=1)) if n > 1 else np.zeros(len(buy)),
+        trades=(np.diff(positions.astype(np.int8), axis=1) == 1).sum(axis=1) + positions[:, 0],
+        exposure=positions.mean(axis=1),
+    )
+
+
+# Set in every worker by _attach: the shared block and its column names
+_shared = {}
+
+
+def _attach(name, shape, columns):
+    # Workers share the parent's resource tracker, so attaching does not
+    # hand them ownership; the parent unlinks the block when the sweep ends
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm
+    _shared['block'] = np.ndarray(shape, dtype=float, buffer=shm.buf, order='F')
+    _shared['columns'] = columns
+
+
+def _run(signal, buy, sell):
+    block, columns = _shared['block'], _shared['columns']
+    result = simulate(block[:, 0], block[:, columns.index(signal)], buy, sell)
+    result['signal'] = signal
+    return result
+
+
+def sweep(frame, grids, workers=MAX_WORKERS, chunk_size=CHUNK_SIZE):
+    """Backtest threshold grids on the signals of frame in a process pool, yielding results as they finish.
+
+    frame's first column is the price and the others are signals, as from
+    signal_frame(). grids maps signal names to (buy thresholds, sell
+    thresholds); every pair with buy <= sell is tested. The frame is copied
+    once into shared memory, so tasks only pickle their thresholds. Each
+    yielded frame holds the statistics of one chunk of pairs.
+    """
+    columns = list(frame.columns)
+    block = np.asarray(frame.to_numpy(dtype=float), order='F')
+    shm = shared_memory.SharedMemory(create=True, size=max(block.nbytes, 1))
+    try:
+        np.ndarray(block.shape, dtype=float, buffer=shm.buf, order='F')[:] = block
+
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shm.name, block.shape, columns)) as executor:
+            futures = []
+            for signal, (buys, sells) in grids.items():
+                buy, sell = (grid.ravel() for grid in np.meshgrid(np.asarray(buys, float), np.asarray(sells, float)))
+                keep = buy <= sell
+                buy, sell = buy[keep], sell[keep]
+                for start in range(0, len(buy), chunk_size):
+                    futures.append(executor.submit(
+                        _run, signal, buy[start:start + chunk_size], sell[start:start + chunk_size]
+                    ))
+
+            for future in as_completed(futures):
+                yield pd.DataFrame(future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run(frame, grids, workers=MAX_WORKERS, chunk_size=CHUNK_SIZE):
+    """Return the results of sweep() in one frame, best total return first."""
+    results = pd.concat(list(sweep(frame, grids, workers, chunk_size)), ignore_index=True)
+    return results.sort_values('total_return', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,130 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# A band model bounds a series between
+#   overbought(row) = -log(top_scale * row + top_offset) + top_shift
+#   oversold(row)   =  log(bottom_scale * row + bottom_offset) - bottom_shift
+# and rescales it to ((value - oversold) / (overbought - oversold)) ** exponent,
+# where row counts the days from the model's start_row (default 0)
+PARAMETERS = ['top_scale', 'top_offset', 'top_shift', 'bottom_scale', 'bottom_offset', 'bottom_shift', 'exponent']
+
+# The curves norm_mvrv uses on log2(MVRV), with rows counted from 1
+MVRV_MODEL = dict(
+    top_scale=1.0, top_offset=2000.0, top_shift=10.75,
+    bottom_scale=1.0, bottom_offset=2500.0, bottom_shift=9.35,
+    exponent=1.5, start_row=1,
+)
+
+# The curves price_models uses on the Normalized Price, with rows counted from 0
+CYCLE_MODEL = dict(
+    top_scale=1.1, top_offset=4000.0, top_shift=9.8,
+    bottom_scale=0.25, bottom_offset=11000.0, bottom_shift=9.4,
+    exponent=1.0, start_row=0,
+)
+
+# Parameter sets evaluated at once by rank(); bounds the (params x days) arrays in memory
+CHUNK_SIZE = 512
+
+
+def grid(base, **ranges):
+    """Return every combination of ranges, with the other parameters taken from base.
+
+    Each range is a sequence of values for one parameter; the result maps
+    every parameter to an array with one entry per combination, and keeps
+    base's start_row.
+    """
+    names = list(ranges)
+    combinations = np.array(list(itertools.product(*(ranges[name] for name in names))), dtype=float)
+    params = {name: np.full(len(combinations), float(base[name])) for name in PARAMETERS}
+    for i, name in enumerate(names):
+        params[name] = combinations[:, i]
+    if 'start_row' in base:
+        params['start_row'] = base['start_row']
+    return params
+
+
+def _column(params, name):
+    return np.asarray(params[name], dtype=float).reshape(-1, 1)
+
+
+def _log_curve(params, scale, offset, rows):
+    # Sweeps mostly vary the shifts, so take the log once per distinct (scale, offset)
+    pairs = np.broadcast_arrays(_column(params, scale), _column(params, offset))
+    pairs, inverse = np.unique(np.hstack(pairs), axis=0, return_inverse=True)
+    return np.log(pairs[:, :1] * rows + pairs[:, 1:])[inverse.ravel()]
+
+
+def evaluate(values, params, start_row=None):
+    """Return the rescaled series for every parameter set as a (params x days) array.
+
+    values is the series the bands are fitted to (log2 MVRV or the Normalized
+    Price) and params maps every name in PARAMETERS to a scalar or an array
+    with one entry per parameter set. The first day is row start_row,
+    default params' start_row or 0.
+    """
+    if start_row is None:
+        start_row = params.get('start_row', 0)
+    values = np.asarray(values, dtype=float)
+    rows = np.arange(start_row, start_row + len(values), dtype=float)
+
+    overbought = -_log_curve(params, 'top_scale', 'top_offset', rows) + _column(params, 'top_shift')
+    oversold = _log_curve(params, 'bottom_scale', 'bottom_offset', rows) - _column(params, 'bottom_shift')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        adjusted = (values - oversold) / (overbought - oversold)
+        exponent = _column(params, 'exponent')
+        if not (exponent == 1).all():
+            adjusted **= exponent
+    return adjusted
+
+
+def _percentiles(adjusted, days, quantiles):
+    # np.nanpercentile per row, but from one sort: NaNs sort last, so each row's
+    # valid values are its first days entries
+    ordered = np.sort(adjusted, axis=1)
+    index = np.arange(len(ordered))
+    result = []
+    for q in quantiles:
+        position = q * np.maximum(days - 1, 0)
+        lower = np.floor(position).astype(int)
+        upper = np.minimum(lower + 1, np.maximum(days - 1, 0))
+        below, above = ordered[index, lower], ordered[index, upper]
+        value = below + (above - below) * (position - lower)
+        result.append(np.where(days > 0, value, np.nan))
+    return result
+
+
+def fit_statistics(adjusted):
+    """Return how well each row of adjusted stays in the [0, 1] channel the bands define.
+
+    'below' and 'above' are the shares of days outside the channel, 'low' and
+    'high' the 1st and 99th percentiles, and 'error' their distance from 0 and 1.
+    """
+    valid = ~np.isnan(adjusted)
+    days = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        below = (adjusted < 0).sum(axis=1) / days
+        above = (adjusted > 1).sum(axis=1) / days
+        low, high = _percentiles(adjusted, days, [0.01, 0.99])
+    error = np.sqrt((low ** 2 + (high - 1) ** 2) / 2)
+    return dict(days=days, below=below, above=above, low=low, high=high, error=error)
+
+
+def rank(values, params, start_row=None, chunk_size=CHUNK_SIZE):
+    """Evaluate every parameter set against values and return them ranked by fit, best first."""
+    if start_row is None:
+        start_row = params.get('start_row', 0)
+    n_params = int(np.prod(np.broadcast_shapes(*(np.shape(params[name]) for name in PARAMETERS))))
+    full = {name: np.broadcast_to(np.asarray(params[name], dtype=float), (n_params,)) for name in PARAMETERS}
+
+    chunks = []
+    for start in range(0, n_params, chunk_size):
+        chunk = {name: full[name][start:start + chunk_size] for name in PARAMETERS}
+        chunks.append(fit_statistics(evaluate(values, chunk, start_row)))
+
+    ranked = pd.DataFrame(full)
+    for name in chunks[0]:
+        ranked[name] = np.concatenate([chunk[name] for chunk in chunks])
+    return ranked.sort_values('error', kind='stable').reset_index(drop=True)
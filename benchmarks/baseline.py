@@ -0,0 +1,170 @@
+"""Code the loaders and metrics ran before they were optimised, kept to benchmark and test against.
+
+Each function is the code the old modules ran, wrapped so it can be called
+on a page, a script or a frame.
+"""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+from bs4 import BeautifulSoup as bs
+
+
+def bracket_loop(raw_data):
+    """Return the traces of the Plotly.newPlot( call in raw_data with the old bracket loop."""
+    string_data = str(raw_data).replace("\\", "")
+
+    # Find the start of the JSON-like structure by looking for 'Plotly.newPlot('
+    start_index = string_data.find('Plotly.newPlot(')
+    if start_index == -1:
+        raise ValueError("Could not find 'Plotly.newPlot(' in the script content.")
+
+    # Find the start of the data array by looking for the first '[' after 'Plotly.newPlot('
+    start_index = string_data.find('[', start_index)
+    # Find the end of the data array by looking for the matching ']' bracket
+    end_index = start_index
+    bracket_count = 1
+    while end_index < len(string_data) and bracket_count > 0:
+        end_index += 1
+        if string_data[end_index] == '[':
+            bracket_count += 1
+        elif string_data[end_index] == ']':
+            bracket_count -= 1
+
+    # Extract the JSON-like string and convert it to a Python object
+    return json.loads(string_data[start_index:end_index + 1])
+
+
+def soup_plotly_script(html):
+    """Return the third <script> tag of a checkonchain page, found through an lxml DOM."""
+    soup = bs(html, "lxml")
+    return soup.find_all("script")[2]
+
+
+def soup_var_trace_script(html):
+    """Return the text of the chainexposed script holding the traces, found through an html.parser DOM."""
+    soup = bs(html, "html.parser")
+    for script_tag in soup.find_all("script"):
+        if 'var trace' in script_tag.text:
+            return script_tag.text
+    return None
+
+
+def split_var_traces(script, names=None):
+    """Return the name, x and y of every 'var trace' object in script with the old split and regexes."""
+    # Initialize an empty list to hold all the trace data
+    all_traces_data = []
+
+    # Split the script content by 'var trace' to separate the traces
+    traces = script.split('var trace')[1:]  # Skip the first split as it's before the first 'var trace'
+
+    # Iterate over each trace
+    for trace_str in traces:
+        # Use regex to find the name first so unwanted traces can be skipped
+        name_match = re.search(r"name:\s*('.*?'),", trace_str)
+        name_value = name_match.group(1).strip("'") if name_match else ""
+        if names is not None and name_value not in names:
+            continue
+        # Use regex to find the x and y values
+        x_match = re.search(r"x:\s*(\[.*?\]),", trace_str, re.DOTALL)
+        y_match = re.search(r"y:\s*(\[.*?\]),", trace_str, re.DOTALL)
+        # Extract the values using the matches
+        x_values = json.loads(x_match.group(1)) if x_match else []
+        y_values = json.loads(y_match.group(1)) if y_match else []
+        # Append the extracted data to the list
+        all_traces_data.append({
+            'x': x_values,
+            'y': y_values,
+            'name': name_value
+        })
+    return all_traces_data
+
+
+def per_trace_frame(traces, columns):
+    """Return the frame of the traces named in columns with the old per-trace DataFrame loop."""
+    # Initialize an empty dictionary to store the dataframes
+    dataframes = {}
+
+    # Iterate over each trace in the data
+    for trace in traces:
+        if 'x' in trace and 'y' in trace:
+            # Convert 'x' data to datetime and 'y' data to float, coercing errors to NaN
+            df = pd.DataFrame({
+                'Date': pd.to_datetime(trace['x']),
+                'Value': pd.to_numeric(trace['y'], errors='coerce')
+            }).set_index('Date')
+
+            # Use the trace name as the key in the dictionary of dataframes
+            trace_name = trace.get('name', 'Unnamed Trace')
+            dataframes[trace_name] = df
+
+    # Create a new DataFrame for the combined data, indexed on the price dates
+    combined_df = pd.DataFrame(index=dataframes[next(iter(columns))].index)
+
+    # Add the 'Y' data from each trace as a separate column in the combined DataFrame
+    for trace_name, column in columns.items():
+        combined_df[column] = dataframes[trace_name]['Value']
+
+    return combined_df
+
+
+def cycle_pipeline(combined_df):
+    """Return the cycle-band frame the way the pandas metrics computed it before the kernel."""
+    # terminal_prices
+    combined_df = combined_df.copy()
+    combined_df['Delta Top'] = combined_df['Delta Price'] * 7
+    combined_df['Vaulted Top'] = combined_df['Vaulted Price'] * 1.75
+    combined_df['Transferred Price'] = combined_df['Realized Price'] - combined_df['Balanced Price']
+    combined_df['Terminal Price'] = combined_df['Transferred Price'] * 21
+    combined_df['Transferred Price AVIV'] = combined_df['True Mean Price'] - combined_df['Balanced Price']
+    combined_df['Terminal Price AVIV'] = combined_df['Transferred Price AVIV'] * 6
+    df = combined_df[combined_df.index >= pd.to_datetime('2012')].copy()
+
+    # avg_top, avg_bot and normalized_price
+    avg_top = df[['Vaulted Top', 'Terminal Price AVIV', 'Delta Top']].mean(axis = 1)
+    avg_bot = df[['Delta Price', 'Cointime Price', 'Realized Price']].mean(axis = 1)
+    normalized_price = (df['BTC Price'] - avg_bot) / (avg_top - avg_bot)
+
+    # adjusted_normalized_price
+    adjusted = normalized_price.to_frame('Normalized Price')
+    adjusted['Row Number'] = np.arange(len(adjusted))
+    adjusted['Overbought'] = -np.log(1.1 * adjusted['Row Number'] + 4000) + 9.8
+    adjusted['Oversold'] = np.log(0.25 * adjusted['Row Number'] + 11000) - 9.4
+    adjusted['Adjusted Normalized Price'] = (
+        (adjusted['Normalized Price'] - adjusted['Oversold']) / (adjusted['Overbought'] - adjusted['Oversold'])
+    )
+
+    # get_dataframe
+    df = df.copy()
+    df['Avg Top'] = avg_top
+    df['Avg Bot'] = avg_bot
+    return df.join(adjusted)
+
+
+def apply_render_mode(fig, mode="auto", min_points=1000):
+    """Return fig with its large scatter traces as WebGL, converting each through Plotly's validators."""
+    def to_scattergl(trace):
+        properties = trace.to_plotly_json()
+        properties.pop('type', None)
+        try:
+            return go.Scattergl(**properties)
+        except ValueError:
+            # Something only SVG supports (e.g. spline lines): keep the trace as it is
+            return trace
+
+    if mode == "never":
+        return fig
+
+    data = []
+    for trace in fig.data:
+        if trace.type == 'scatter' and (
+            mode == "always" or (trace.x is not None and len(trace.x) >= min_points)
+        ):
+            trace = to_scattergl(trace)
+        data.append(trace)
+
+    if all(new is old for new, old in zip(data, fig.data)):
+        return fig
+    return go.Figure(data=data, layout=fig.layout)
@@ -0,0 +1,58 @@
+"""Time backtest.run over threshold grids with 1 to N worker processes.
+
+Sweeps a --grid x --grid threshold grid on each of --signals random signals
+over --days days of a random-walk price, as signal_frame() would give, and
+reports the best wall-clock time and the speedup over one worker.
+
+    python benchmarks/bench_backtest.py [--workers N] [--days N] [--signals N] [--grid N] [--repeat N]
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import harness
+import backtest
+
+
+def frame(days, signals):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2012-01-01", periods=days, freq="D", name="Date")
+    df = pd.DataFrame({"BTC Price": 100 * np.exp(np.cumsum(rng.normal(0.001, 0.03, days)))}, index=index)
+    for i in range(signals):
+        df[f"Signal {i}"] = np.cumsum(rng.normal(0, 0.1, days))
+    return df
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="most worker processes (default: cores)")
+    parser.add_argument("--days", type=int, default=4600, help="days of history (default: 4600)")
+    parser.add_argument("--signals", type=int, default=4, help="signals swept (default: 4)")
+    parser.add_argument("--grid", type=int, default=40, help="thresholds per side of each grid (default: 40)")
+    parser.set_defaults(repeat=3)
+    args = parser.parse_args()
+
+    df = frame(args.days, args.signals)
+    grids = {
+        column: (np.linspace(-3, 3, args.grid), np.linspace(-3, 3, args.grid))
+        for column in df.columns[1:]
+    }
+    pairs = sum(int((np.add.outer(sells, -buys) >= 0).sum()) for buys, sells in grids.values())
+
+    rows = []
+    expected = None
+    for workers in range(1, args.workers + 1):
+        # Chunks finish in any order, so pairs with equal returns may come in any order too
+        results = backtest.run(df, grids, workers=workers).sort_values(["signal", "buy", "sell"], ignore_index=True)
+        if expected is None:
+            expected = results
+        pd.testing.assert_frame_equal(results, expected)
+        seconds = harness.best_time(lambda: backtest.run(df, grids, workers=workers), args.repeat)
+        rows.append({"workers": workers, "pairs": pairs, "s": seconds, "speedup": rows[0]["s"] / seconds if rows else 1.0})
+
+    harness.report(rows, ["workers", "pairs", "s", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare the cycle-band kernel with the pandas metrics it replaced.
+
+Times the old pipeline, cycle_frame on the full history and CycleFrame
+extending a computed history by one day, on a generated onchain_originals
+frame with gaps like the live one. Reports the best time and Python's peak
+allocation for each.
+
+    python benchmarks/bench_cycle_bands.py [--days N] [--repeat N]
+"""
+import numpy as np
+import pandas as pd
+
+import harness
+from baseline import cycle_pipeline
+from price_models import PRICE_COLUMNS, CycleFrame, cycle_frame
+
+
+def combined_frame(days):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2010-07-18", periods=days, freq="D", name="Date")
+    values = np.exp(np.cumsum(rng.normal(0.001, 0.03, (days, len(PRICE_COLUMNS))), axis=0))
+    values[rng.random(values.shape) < 0.05] = np.nan
+    return pd.DataFrame(values, index=index, columns=PRICE_COLUMNS)
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=harness.DAYS, help=f"days of history (default: {harness.DAYS})")
+    args = parser.parse_args()
+
+    combined_df = combined_frame(args.days)
+    after_2012 = combined_df[combined_df.index >= pd.to_datetime('2012')]
+    pd.testing.assert_frame_equal(cycle_frame(after_2012), cycle_pipeline(combined_df), check_exact=True)
+
+    def computed_but_last_day():
+        cycles = CycleFrame()
+        cycles.extend(after_2012.iloc[:-1])
+        return cycles
+
+    cases = [
+        ("pandas pipeline", lambda: cycle_pipeline(combined_df), None),
+        ("cycle_frame", lambda: cycle_frame(after_2012), None),
+        # Only the append is timed, each time on a history missing its last day
+        ("CycleFrame.extend, 1 day", lambda cycles: cycles.extend(after_2012), computed_but_last_day),
+    ]
+    rows = []
+    for method, run, setup in cases:
+        rows.append({
+            "method": method,
+            "days": args.days,
+            "ms": harness.best_time(run, args.repeat, setup) * 1000,
+            "peak MiB": harness.peak_allocated(run, setup) / harness.MIB,
+        })
+
+    harness.report(rows, ["method", "days", "ms", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure what downsampling saves in figure JSON and what it costs per rerun.
+
+Builds a chart of --traces lines over --days days through figure_cache, as
+the pages do, and reports the serialized size and serialization time of the
+full and the downsampled figure, and the time a rerun spends getting the
+figure to show: rendering it every time as before, or through
+figure_cache.rendered as now. Runs with and without a one-year viewport.
+
+    python benchmarks/bench_downsample.py [--days N] [--traces N] [--repeat N]
+"""
+import numpy as np
+import pandas as pd
+
+import harness
+import figure_cache
+from downsample import MAX_POINTS, downsample_figure
+from figure_spec import build_figure, line
+from webgl import WEBGL, apply_render_mode
+
+
+@figure_cache.cached
+def chart(df):
+    return build_figure(df, [line(column, column, "blue") for column in df.columns], y_title="Value")
+
+
+def frame(days, traces):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2012-01-01", periods=days, freq="D", name="Date")
+    values = np.exp(np.cumsum(rng.normal(0, 0.02, (days, traces)), axis=0))
+    return pd.DataFrame(values, index=index, columns=[f"Series {i}" for i in range(traces)])
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=4600, help="days per trace (default: 4600)")
+    parser.add_argument("--traces", type=int, default=9, help="lines in the chart (default: 9)")
+    args = parser.parse_args()
+    df = frame(args.days, args.traces)
+    chart(df)
+
+    rows = []
+    for label, x_range in [("everything", None), ("one year", (df.index[-366], df.index[-1]))]:
+        def render(fig):
+            downsample_figure(fig, n_out=MAX_POINTS, x_range=x_range)
+            return apply_render_mode(fig, WEBGL)
+
+        full = chart(df)
+        shown = render(chart(df))
+        for figure, fig in [("full", full), ("downsampled", shown)]:
+            rows.append({
+                "viewport": label,
+                "figure": figure,
+                "JSON KiB": len(fig.to_json()) / 1024,
+                "to_json ms": harness.best_time(fig.to_json, args.repeat) * 1000,
+            })
+
+        params = (x_range, MAX_POINTS, WEBGL)
+        figure_cache.rendered(chart(df), params, render)
+        rows.append({
+            "viewport": label,
+            "figure": "rerun, rendered every time",
+            "rerun ms": harness.best_time(lambda: render(chart(df)), args.repeat) * 1000,
+        })
+        rows.append({
+            "viewport": label,
+            "figure": "rerun, figure_cache.rendered",
+            "rerun ms": harness.best_time(lambda: figure_cache.rendered(chart(df), params, render), args.repeat) * 1000,
+        })
+
+    harness.report(rows, ["viewport", "figure", "JSON KiB", "to_json ms", "rerun ms"])
+
+
+if __name__ == "__main__":
+    main()
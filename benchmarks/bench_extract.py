@@ -0,0 +1,39 @@
+"""Compare extract_plotly_data with the old bracket loop on checkonchain pages.
+
+Both get the text of the <script> holding the Plotly.newPlot( call, so only
+locating and decoding the trace array is timed. Reports the best time and the
+peak memory Python allocated for each.
+
+    python benchmarks/bench_extract.py [page.html ...] [--repeat N]
+"""
+import harness
+from baseline import bracket_loop
+from plotly_extract import PLOTLY_MARKER, extract_plotly_data, find_script
+
+
+def main():
+    args = harness.parser(__doc__.splitlines()[0]).parse_args()
+    rows = []
+    for label, _, html in harness.load_pages(args.pages, layouts=("checkonchain",)):
+        script = find_script(html, PLOTLY_MARKER)
+
+        old, new = bracket_loop(script), extract_plotly_data(script)
+        assert [(trace.get("name"), len(trace["y"])) for trace in old] == \
+            [(trace.get("name"), len(trace["y"])) for trace in new], label
+
+        for method, run in [
+            ("bracket loop", lambda: bracket_loop(script)),
+            ("extract_plotly_data", lambda: extract_plotly_data(script)),
+        ]:
+            rows.append({
+                "page": label,
+                "method": method,
+                "ms": harness.best_time(run, args.repeat) * 1000,
+                "peak MiB": harness.peak_allocated(run) / harness.MIB,
+            })
+
+    harness.report(rows, ["page", "method", "ms", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
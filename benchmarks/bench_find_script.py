@@ -0,0 +1,44 @@
+"""Compare find_script with the BeautifulSoup lookups it replaced.
+
+checkonchain pages used to go through an lxml DOM to their third <script>
+tag and chainexposed pages through an html.parser DOM to the script holding
+'var trace'. Reports the best time to get the script text and how far each
+lookup raises the resident set (Linux only) and Python's peak allocation.
+
+    python benchmarks/bench_find_script.py [page.html ...] [--repeat N]
+"""
+import harness
+from baseline import soup_plotly_script, soup_var_trace_script
+from plotly_extract import PLOTLY_MARKER, VAR_TRACE_MARKER, find_script
+
+LOOKUPS = {
+    "checkonchain": (PLOTLY_MARKER, lambda html: soup_plotly_script(html).string),
+    "chainexposed": (VAR_TRACE_MARKER, soup_var_trace_script),
+}
+
+
+def main():
+    args = harness.parser(__doc__.splitlines()[0]).parse_args()
+    rows = []
+    for label, layout, html in harness.load_pages(args.pages):
+        marker, soup_lookup = LOOKUPS[layout]
+        assert find_script(html, marker).strip() == soup_lookup(html).strip(), label
+
+        for method, run in [
+            ("BeautifulSoup", lambda: soup_lookup(html)),
+            ("find_script", lambda: find_script(html, marker)),
+        ]:
+            rss = harness.peak_rss(run)
+            rows.append({
+                "page": label,
+                "method": method,
+                "ms": harness.best_time(run, args.repeat) * 1000,
+                "RSS MiB": None if rss is None else rss / harness.MIB,
+                "peak MiB": harness.peak_allocated(run) / harness.MIB,
+            })
+
+    harness.report(rows, ["page", "method", "ms", "RSS MiB", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
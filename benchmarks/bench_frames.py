@@ -0,0 +1,43 @@
+"""Compare frames.build_frame with the old per-trace DataFrame loop on decoded pages.
+
+Both get the traces extract_plotly_data decoded from a checkonchain page,
+so only building the combined frame is timed: once with every trace on the
+page as a column and once with the two a source reads. Reports the best time
+and Python's peak allocation for each.
+
+    python benchmarks/bench_frames.py [page.html ...] [--repeat N]
+"""
+import pandas as pd
+
+import harness
+from baseline import per_trace_frame
+from frames import build_frame
+from plotly_extract import PLOTLY_MARKER, extract_plotly_data, find_script
+
+
+def main():
+    args = harness.parser(__doc__.splitlines()[0]).parse_args()
+    rows = []
+    for label, _, html in harness.load_pages(args.pages, layouts=("checkonchain",)):
+        traces = extract_plotly_data(find_script(html, PLOTLY_MARKER))
+        every = {trace["name"]: trace["name"] for trace in traces if "x" in trace and "y" in trace}
+
+        for selection, columns in [("every trace", every), ("Price, MVRV Ratio", {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"})]:
+            pd.testing.assert_frame_equal(build_frame(traces, columns), per_trace_frame(traces, columns))
+            for method, run in [
+                ("per-trace loop", lambda: per_trace_frame(traces, columns)),
+                ("build_frame", lambda: build_frame(traces, columns)),
+            ]:
+                rows.append({
+                    "page": label,
+                    "columns": selection,
+                    "method": method,
+                    "ms": harness.best_time(run, args.repeat) * 1000,
+                    "peak MiB": harness.peak_allocated(run) / harness.MIB,
+                })
+
+    harness.report(rows, ["page", "columns", "method", "ms", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Time a Streamlit rerun of each page with its sources served locally.
+
+Serves a full-history page for every source from a local stand-in for the
+chart hosts and runs each page with streamlit.testing.v1.AppTest: once
+cold, which downloads and parses its sources, then --repeat times more,
+which is what every widget interaction or refresh of the page costs. The
+Capriole page reads Google Sheets and is left out.
+
+    python benchmarks/bench_rerun.py [--days N] [--repeat N]
+"""
+import glob
+import os
+import time
+
+import harness
+from conftest import Upstream  # also points the caches at a scratch directory
+from streamlit.testing.v1 import AppTest
+
+import chart_pages
+import sources
+
+PAGES = [os.path.join(harness.ROOT, "Hello.py")] + sorted(
+    path for path in glob.glob(os.path.join(harness.ROOT, "pages", "*.py"))
+    if not os.path.basename(path).startswith(("_", "0_"))
+)
+
+
+def serve(upstream, days):
+    # Point every source at a generated page holding the traces it reads
+    for name, source in sources.SOURCES.items():
+        names = list(source["columns"])
+        if source.get("format") == "var_trace":
+            body = chart_pages.var_trace_page(days=days, names=names)
+        else:
+            body = chart_pages.plotly_page(days=days, names=names)
+        upstream.routes[f"/{name}"] = [{"body": body, "headers": {"Content-Type": "text/html; charset=utf-8"}}]
+        source["url"] = upstream.url(f"/{name}")
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=harness.DAYS, help=f"days per source (default: {harness.DAYS})")
+    args = parser.parse_args()
+    upstream = Upstream()
+    serve(upstream, args.days)
+
+    rows = []
+    try:
+        for path in PAGES:
+            app = AppTest.from_file(path, default_timeout=120)
+            started = time.perf_counter()
+            app.run()
+            cold = time.perf_counter() - started
+            assert not app.exception, (path, app.exception)
+            rows.append({
+                "page": os.path.basename(path),
+                "cold ms": cold * 1000,
+                "rerun ms": harness.best_time(app.run, args.repeat) * 1000,
+            })
+    finally:
+        upstream.close()
+
+    harness.report(rows, ["page", "cold ms", "rerun ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure decoding every trace of a page against decoding only the ones a source reads.
+
+Full mode is extract_plotly_data or extract_var_traces without names;
+selective mode passes the trace names of a source, so the arrays of every
+other trace are skipped undecoded. Reports the best time and Python's peak
+allocation for each mode.
+
+    python benchmarks/bench_selective.py [page.html ...] [--names NAME ...] [--repeat N]
+"""
+import harness
+from plotly_extract import PLOTLY_MARKER, VAR_TRACE_MARKER, extract_plotly_data, extract_var_traces, find_script
+
+# The traces the mvrv and realized_price_ribbon sources read from pages of each layout
+NAMES = {
+    "checkonchain": {"Price", "MVRV Ratio"},
+    "chainexposed": {"Price", "1m to 3m"},
+}
+PARSERS = {
+    "checkonchain": (PLOTLY_MARKER, extract_plotly_data),
+    "chainexposed": (VAR_TRACE_MARKER, extract_var_traces),
+}
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--names", nargs="+", help="traces to decode in selective mode (default: a source's)")
+    args = parser.parse_args()
+
+    rows = []
+    for label, layout, html in harness.load_pages(args.pages):
+        marker, extract = PARSERS[layout]
+        script = find_script(html, marker)
+        names = set(args.names) if args.names else NAMES[layout]
+
+        for mode, run in [
+            ("full", lambda: extract(script)),
+            ("selective", lambda: extract(script, names=names)),
+        ]:
+            rows.append({
+                "page": label,
+                "mode": mode,
+                "traces": len(run()),
+                "ms": harness.best_time(run, args.repeat) * 1000,
+                "peak MiB": harness.peak_allocated(run) / harness.MIB,
+            })
+
+    harness.report(rows, ["page", "mode", "traces", "ms", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare reloading a source's frame from the local store with parsing its page again.
+
+A re-parse is what a cold start without the store does once the page is
+downloaded: locate and decode the traces the source reads and build its
+frame. A reload reads the Feather file store.write left from that frame.
+Reports the best time and Python's peak allocation of each, and the size of
+the stored file.
+
+    python benchmarks/bench_store.py [page.html ...] [--repeat N]
+"""
+import os
+import tempfile
+
+import harness
+import store
+from frames import build_frame
+from plotly_extract import decode_plotly_payload, extract_var_traces, load_script, stream_plotly_payload
+
+# The traces the mvrv and realized_price_ribbon sources read from pages of each layout
+COLUMNS = {
+    "checkonchain": {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"},
+    "chainexposed": {"Price": "Price", "1m to 3m": "1m to 3m"},
+}
+
+
+def reparse(layout, html):
+    # The frame the source's builder in sources makes of a downloaded page
+    columns = COLUMNS[layout]
+    if layout == "checkonchain":
+        traces = decode_plotly_payload(stream_plotly_payload([html], set(columns)), set(columns))
+    else:
+        traces = extract_var_traces(load_script(html, 'var trace'), names=set(columns))
+    return build_frame(traces, columns)
+
+
+def main():
+    args = harness.parser(__doc__.splitlines()[0]).parse_args()
+    store.STORE_DIR = tempfile.mkdtemp(prefix="onchain-bench-store-")
+
+    rows = []
+    for i, (label, layout, html) in enumerate(harness.load_pages(args.pages)):
+        name = f"page-{i}"
+        df = reparse(layout, html)
+        store.write(name, df)
+        assert store.read(name).equals(df.rename_axis("Date")), label
+
+        for method, run in [
+            ("re-parse page", lambda: reparse(layout, html)),
+            ("store.read", lambda: store.read(name)),
+        ]:
+            rows.append({
+                "page": label,
+                "method": method,
+                "ms": harness.best_time(run, args.repeat) * 1000,
+                "peak MiB": harness.peak_allocated(run) / harness.MIB,
+            })
+        rows[-1]["stored KiB"] = os.path.getsize(store._path(name)) / 1024
+
+    harness.report(rows, ["page", "method", "ms", "peak MiB", "stored KiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare parsing a checkonchain page as it downloads with parsing it once it is complete.
+
+The page arrives in --chunk-size pieces at --bandwidth MiB/s, as from
+fetch.stream. The whole-page path joins every chunk and then runs
+extract_plotly_data; the streaming path feeds the chunks to
+stream_plotly_payload as they come and decodes the payload. Both build the
+frame of the traces the mvrv source reads. Reports the time from the first
+chunk to the frame, and how far parsing raises the resident set (Linux
+only) and Python's peak allocation.
+
+    python benchmarks/bench_stream.py [page.html ...] [--bandwidth MiB/s] [--chunk-size N] [--repeat N]
+"""
+import time
+
+import harness
+from frames import build_frame
+from plotly_extract import decode_plotly_payload, extract_plotly_data, stream_plotly_payload
+
+COLUMNS = {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"}
+
+
+def download(html, chunk_size, bandwidth):
+    # Yield html in chunks no sooner than a link of bandwidth bytes per second would deliver them
+    started = time.perf_counter()
+    for start in range(0, len(html), chunk_size):
+        if bandwidth:
+            time.sleep(max(started + start / bandwidth - time.perf_counter(), 0))
+        yield html[start:start + chunk_size]
+
+
+def whole_page(chunks):
+    return extract_plotly_data("".join(chunks), names=set(COLUMNS))
+
+
+def streaming(chunks):
+    return decode_plotly_payload(stream_plotly_payload(chunks, set(COLUMNS)), set(COLUMNS))
+
+
+def rss(run):
+    growth = harness.peak_rss(run)
+    return None if growth is None else growth / harness.MIB
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--bandwidth", type=float, default=20, help="download speed in MiB/s, 0 for none (default: 20)")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="characters per chunk (default: 65536)")
+    parser.set_defaults(repeat=5)
+    args = parser.parse_args()
+    bandwidth = args.bandwidth * harness.MIB
+
+    rows = []
+    for label, _, html in harness.load_pages(args.pages, layouts=("checkonchain",)):
+        assert whole_page([html]) == streaming([html]), label
+
+        for method, parse in [("whole page", whole_page), ("streaming", streaming)]:
+            rows.append({
+                "page": label,
+                "KiB": len(html) / 1024,
+                "method": method,
+                "first frame ms": harness.best_time(
+                    lambda chunks: build_frame(parse(chunks), COLUMNS), args.repeat,
+                    setup=lambda: download(html, args.chunk_size, bandwidth),
+                ) * 1000,
+                # Memory is measured without the link delay and without building the
+                # frame, which is the same either way
+                "RSS MiB": rss(lambda: parse(download(html, args.chunk_size, 0))),
+                "peak MiB": harness.peak_allocated(parse, setup=lambda: download(html, args.chunk_size, 0)) / harness.MIB,
+            })
+
+    harness.report(rows, ["page", "KiB", "method", "first frame ms", "RSS MiB", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare extract_var_traces with the old split, regex and json.loads parser on chainexposed pages.
+
+Both get the text of the script holding the 'var trace' objects, so only
+parsing it is timed: every trace, and only the traces the
+realized_price_ribbon source reads. Reports the best time and Python's peak
+allocation for each.
+
+    python benchmarks/bench_var_traces.py [page.html ...] [--repeat N]
+"""
+import numpy as np
+import pandas as pd
+
+import harness
+from baseline import split_var_traces
+from plotly_extract import VAR_TRACE_MARKER, extract_var_traces, find_script
+
+# The traces the realized_price_ribbon source reads
+NAMES = {"Price", "1m to 3m"}
+
+
+def main():
+    args = harness.parser(__doc__.splitlines()[0]).parse_args()
+    rows = []
+    for label, _, html in harness.load_pages(args.pages, layouts=("chainexposed",)):
+        script = find_script(html, VAR_TRACE_MARKER)
+
+        for old, new in zip(split_var_traces(script), extract_var_traces(script)):
+            assert old["name"] == new["name"], label
+            assert (pd.DatetimeIndex(old["x"]) == pd.DatetimeIndex(new["x"])).all(), label
+            np.testing.assert_array_equal(np.array(old["y"], dtype=float), new["y"])
+
+        for selection, names in [("every trace", None), ("Price, 1m to 3m", NAMES)]:
+            for method, run in [
+                ("split/regex/json.loads", lambda: split_var_traces(script, names=names)),
+                ("extract_var_traces", lambda: extract_var_traces(script, names=names)),
+            ]:
+                rows.append({
+                    "page": label,
+                    "traces": selection,
+                    "method": method,
+                    "ms": harness.best_time(run, args.repeat) * 1000,
+                    "peak MiB": harness.peak_allocated(run) / harness.MIB,
+                })
+
+    harness.report(rows, ["page", "traces", "method", "ms", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Measure what WebGL rendering costs to build and sends to the browser.
+
+Builds a chart of --traces lines over --days days, as the pages do, and
+reports the serialized size and serialization time of the SVG figure and of
+the WebGL figure apply_render_mode makes of it, and how long the conversion
+takes through Plotly's validators as before and through plain dicts as now.
+
+    python benchmarks/bench_webgl.py [--days N] [--traces N] [--repeat N]
+"""
+import baseline
+import harness
+from bench_downsample import frame
+from figure_spec import build_figure, line
+from webgl import apply_render_mode
+
+
+def main():
+    parser = harness.parser(__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=4600, help="days per trace (default: 4600)")
+    parser.add_argument("--traces", type=int, default=9, help="lines in the chart (default: 9)")
+    args = parser.parse_args()
+    df = frame(args.days, args.traces)
+    fig = build_figure(df, [line(column, column, "blue") for column in df.columns], y_title="Value")
+
+    rows = []
+    for figure, shown in [
+        ("SVG", fig),
+        ("WebGL, validated", baseline.apply_render_mode(fig, "always")),
+        ("WebGL, plain dicts", apply_render_mode(fig, "always")),
+    ]:
+        rows.append({
+            "figure": figure,
+            "JSON KiB": len(shown.to_json()) / 1024,
+            "to_json ms": harness.best_time(shown.to_json, args.repeat) * 1000,
+        })
+    rows[1]["convert ms"] = harness.best_time(lambda: baseline.apply_render_mode(fig, "always"), args.repeat) * 1000
+    rows[2]["convert ms"] = harness.best_time(lambda: apply_render_mode(fig, "always"), args.repeat) * 1000
+
+    harness.report(rows, ["figure", "JSON KiB", "to_json ms", "convert ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Shared helpers for the benchmark scripts.
+
+Each script runs on the fixture pages in tests/fixtures and on a page per
+layout with a full history from tests/chart_pages.py, or on saved pages
+passed on the command line. Times are the best of --repeat runs; memory is
+measured in separate runs so tracing does not skew the times.
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "tests")]
+
+import chart_pages  # noqa: E402
+
+# Days and traces of the generated full-history pages, about the size of the live ones
+DAYS = 5000
+TRACES = {
+    "checkonchain": chart_pages.PLOTLY_TRACES + [f"Extra {letter}" for letter in "CDEFGHIJ"],
+    "chainexposed": chart_pages.VAR_TRACES + ["12m to 18m", "18m to 2y", "2y to 3y", "3y to 5y"],
+}
+FIXTURES = {"checkonchain": "checkonchain.html", "chainexposed": "chainexposed.html"}
+
+MIB = 1024 * 1024
+
+
+def parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("pages", nargs="*", help="saved chart pages (default: the fixtures and generated pages)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per case (default: 20)")
+    return parser
+
+
+def layout(html):
+    """Return which host's layout html is in."""
+    return "chainexposed" if "var trace" in html else "checkonchain"
+
+
+def load_pages(paths=(), layouts=("checkonchain", "chainexposed")):
+    """Return (label, layout, html) for every page to run on."""
+    if paths:
+        loaded = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            if layout(html) in layouts:
+                loaded.append((os.path.basename(path), layout(html), html))
+        return loaded
+
+    generate = {"checkonchain": chart_pages.plotly_page, "chainexposed": chart_pages.var_trace_page}
+    loaded = []
+    for name in layouts:
+        loaded.append((FIXTURES[name], name, chart_pages.fixture(FIXTURES[name])))
+        loaded.append((f"{name}, {DAYS} days", name, generate[name](days=DAYS, names=TRACES[name])))
+    return loaded
+
+
+def best_time(run, repeat, setup=None):
+    """Return the fastest of repeat runs of run() in seconds.
+
+    With setup, each run is run(setup()) and only run is timed.
+    """
+    times = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        gc.collect()
+        started = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def peak_allocated(run, setup=None):
+    """Return the peak bytes Python allocated while run() (or run(setup())) ran."""
+    args = () if setup is None else (setup(),)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _rss_child(run, results):
+    # Hand the memory the parent freed back to the system first, or run() reuses
+    # it without raising the resident set. Then reset the high-water mark and
+    # report how far run() raised it
+    gc.collect()
+    libc = ctypes.util.find_library("c")
+    if libc is not None and hasattr(ctypes.CDLL(libc), "malloc_trim"):
+        ctypes.CDLL(libc).malloc_trim(0)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _proc_status("VmRSS")
+    run()
+    results.put(_proc_status("VmHWM") - before)
+
+
+def _proc_status(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+
+def peak_rss(run):
+    """Return how many bytes run() raised the resident set by, or None off Linux.
+
+    run() is called in a forked child, so pages and modules are already loaded
+    and nothing it leaves behind affects the other cases.
+    """
+    if not os.path.exists("/proc/self/clear_refs"):
+        return None
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_rss_child, args=(run, results))
+    child.start()
+    growth = results.get()
+    child.join()
+    return growth
+
+
+def report(rows, columns):
+    """Print rows (dicts) as a table with the given column names."""
+    widths = {column: max(len(column), *(len(_format(row.get(column, ""))) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(column, "")).ljust(widths[column]) for column in columns))
+
+
+def _format(value):
+    if value is None:
+        return "n/a"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+
+import sources
+import store
+
+LOGGER = logging.getLogger(__name__)
+
+SPREADSHEET = "https://docs.google.com/spreadsheets/d/1aUBtfcosN0-KzZrLQhwVYyRWsomGpNmef1ZY7ZySI8w/edit?usp=sharing"
+
+# Worksheets the Capriole page charts and the read options each one needs
+WORKSHEETS = {
+    "speculation_index": {"usecols": [0, 2]},
+    "breadth_crypto": {},
+}
+
+# Both worksheets are refreshed together, at most once per TTL
+TTL = sources.TTL
+
+_lock = threading.Lock()
+_frames = {}     # worksheet -> frame indexed by date
+_loaded_at = {}  # worksheet -> time.monotonic() of the last successful read
+
+
+def _store_name(worksheet):
+    return f"capriole-{worksheet}"
+
+
+def _parse(df):
+    # Only the rows just read are converted; stored rows are already indexed by date
+    df['date'] = pd.to_datetime(df['date'])
+    return df.set_index('date')
+
+
+def _read(connection, worksheet, stored):
+    # Returns the frame and the index of the rows added, or None if it was read
+    # in full. ttl=0 leaves caching to this module, as skipped rows change the request.
+    options = WORKSHEETS[worksheet]
+    if stored is not None and len(stored):
+        # The sheets only get new rows at the bottom, so skip every row we have
+        # but the last, which tells us whether rows above it were inserted or removed
+        new = _parse(connection.read(
+            spreadsheet=SPREADSHEET, worksheet=worksheet, ttl=0, skiprows=range(1, len(stored)), **options
+        ))
+        if list(new.columns) == list(stored.columns) and len(new) and new.iloc[:1].equals(stored.iloc[-1:]):
+            new = new.iloc[1:]
+            return (pd.concat([stored, new]) if len(new) else stored), new.index
+        LOGGER.info("Worksheet %s changed above its last row, reading it in full", worksheet)
+
+    return _parse(connection.read(spreadsheet=SPREADSHEET, worksheet=worksheet, ttl=0, **options)), None
+
+
+def load(connection):
+    """Return every worksheet in WORKSHEETS as a frame indexed by date.
+
+    connection is anything with the read() of a streamlit_gsheets
+    GSheetsConnection. Frames are served from memory for TTL seconds, then from
+    the local store after a restart, and a refresh only reads and parses the
+    rows added to each sheet since the stored copy.
+    """
+    with _lock:
+        now = time.monotonic()
+        if all(worksheet in _frames and now - _loaded_at[worksheet] <= TTL for worksheet in WORKSHEETS):
+            return dict(_frames)
+
+        for worksheet in WORKSHEETS:
+            df = _frames.get(worksheet)
+            stored_age = None
+            if df is None:
+                # Cold start: reuse the stored copy while it is younger than the TTL
+                stored_age = store.age(_store_name(worksheet))
+                df = store.read(_store_name(worksheet))
+                if df is not None:
+                    df = df.rename_axis('date')
+
+            if df is not None and stored_age is not None and stored_age <= TTL:
+                _loaded_at[worksheet] = now - stored_age
+            else:
+                started = time.perf_counter()
+                df, added = _read(connection, worksheet, df)
+                if added is None or len(added):
+                    store.write(_store_name(worksheet), df)
+                _loaded_at[worksheet] = now
+                LOGGER.info(
+                    "Read %s in %.2fs (%s)", worksheet, time.perf_counter() - started,
+                    "in full" if added is None else f"{len(added)} new rows",
+                )
+            _frames[worksheet] = df
+
+        return dict(_frames)
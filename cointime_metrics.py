@@ -0,0 +1,53 @@
+import pandas as pd
+import figure_cache
+from figure_spec import build_figure, line
+import metrics
+import moments
+
+
+@metrics.metric("aviv_ratio")
+def aviv_ratio_bands(combined_df):
+    # Expanding mean and standard deviation band, updated from the last day seen
+    return moments.expanding_bands(combined_df['AVIV Ratio'], [3], name='aviv_ratio.AVIV Ratio')
+
+
+@metrics.metric("aviv_ratio", "aviv_ratio_bands")
+def get_dataframe_aviv(combined_df, aviv_ratio_bands):
+    return combined_df.join(aviv_ratio_bands)
+
+
+# Function to create the plot using Plotly
+@figure_cache.cached
+def create_chart_aviv(combined_df):
+    # Filter the DataFrame to only include data from 2012 onwards
+    combined_df_filtered = combined_df[combined_df.index.year >= 2012]
+
+    return build_figure(combined_df_filtered, [
+        line('BTC Price', 'BTC Price', 'black'),
+        line('True Market Mean', 'True Market Mean', 'blue'),
+        line('AVIV Ratio', 'AVIV Ratio', 'purple', secondary_y=True),
+        #line('Mean + 2σ', 'Mean + 2σ', 'orange', secondary_y=True),
+        line('Mean + 3σ', 'Mean + 3σ', 'red', secondary_y=True),
+        #line('Mean - 1σ', 'Mean - 1σ', 'green', secondary_y=True),
+    ], y_title='BTC Price (log scale)', y2_title='True Market Mean & AVIV Ratio', hlines=[(0, 'gray')])
+
+@figure_cache.cached
+def create_chart_aviv_nupl(aviv_nupl):
+    # The full-history and post-2012 bands come from aviv_nupl.aviv_nupl_df
+    aviv_nupl = aviv_nupl.copy()
+
+    if not isinstance(aviv_nupl.index, pd.DatetimeIndex):
+        aviv_nupl.index = pd.to_datetime(aviv_nupl.index)
+
+    # Filter the DataFrame to only include data from 2012 onwards
+    combined_df_filtered_nupl = aviv_nupl[aviv_nupl.index.year >= 2012]
+
+    return build_figure(combined_df_filtered_nupl, [
+        line('BTC Price', 'BTC Price', 'black'),
+        line('True Market Mean', 'True Market Mean', 'blue'),
+        line('AVIV NUPL', 'AVIV NUPL', 'purple', secondary_y=True),
+        #line('Mean + 2σ', 'Mean + 2σ', 'red', secondary_y=True),
+        #line('Mean + 1.5σ', 'Mean + 1.5σ', 'orange', secondary_y=True),
+        line('Mean - 2σ', 'Mean - 2σ', 'green', secondary_y=True),
+        line('Mean + 1.25σ', 'Mean + 1.25σ', 'red', secondary_y=True),
+    ], y_title='BTC Price (log scale)', y2_title='True Market Mean & AVIV NUPL', hlines=[(0, 'gray')])
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Points kept per trace; a chart is at most a couple of thousand pixels wide,
+# so more than this only makes the figure JSON bigger and the browser slower
+MAX_POINTS = int(os.environ.get("ONCHAIN_MAX_POINTS", 1500))
+
+
+def lttb_indices(x, y, n_out):
+    """Return the indices of the n_out points Largest-Triangle-Three-Buckets keeps."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # The first and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # The third triangle corner is the average of the next bucket
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Keep the point of this bucket that spans the largest triangle
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Return the indices of the minimum and maximum of each of n_out / 2 buckets."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    # Two points per bucket plus the two end points
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1).astype(np.int64)
+    indices = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        chunk = y[start:end]
+        indices.append(start + int(np.argmin(chunk)))
+        indices.append(start + int(np.argmax(chunk)))
+
+    return np.unique(indices)
+
+
+def _as_numbers(x):
+    x = np.asarray(x)
+    if x.dtype.kind in 'iuf':
+        return x.astype(float)
+    # Dates (datetime64 or Timestamp objects) are compared as nanoseconds; pandas
+    # keeps each input's own unit, so both the trace and the bounds are cast first
+    return pd.DatetimeIndex(pd.to_datetime(x)).as_unit('ns').asi8.astype(float)
+
+
+def downsample_figure(fig, n_out=MAX_POINTS, x_range=None, method="lttb"):
+    """Trim every x/y trace of fig to x_range and downsample it to n_out points, in place.
+
+    Only the points inside x_range are considered, so narrowing the range
+    brings back full resolution once it holds fewer than n_out points.
+    """
+    if x_range is not None:
+        low, high = (_as_numbers([bound])[0] for bound in x_range)
+
+    for trace in fig.data:
+        if trace.x is None or trace.y is None or len(trace.x) != len(trace.y):
+            continue
+
+        x = np.asarray(trace.x)
+        y = np.asarray(trace.y, dtype=float)
+        x_numbers = _as_numbers(x)
+
+        in_range = np.ones(len(y), dtype=bool)
+        if x_range is not None:
+            in_range = (x_numbers >= low) & (x_numbers <= high)
+        points = np.flatnonzero(in_range)
+        if len(points) <= n_out:
+            trace.update(x=x[points], y=y[points])
+            continue
+
+        # Gaps are left out of the bucketing, as LTTB needs finite values, and the
+        # first point of each gap is put back afterwards so the line still breaks
+        # (within the n_out points, as each gap gets one of them)
+        finite = np.isfinite(y)
+        points = np.flatnonzero(in_range & finite)
+        gap = in_range & ~finite
+        gap_starts = np.flatnonzero(gap & ~np.concatenate(([False], gap[:-1])))
+
+        n_points = n_out - len(gap_starts)
+        if method == "minmax":
+            indices = minmax_indices(y[points], n_points)
+        else:
+            indices = lttb_indices(x_numbers[points], y[points], n_points)
+
+        indices = np.union1d(points[indices], gap_starts)
+        trace.update(x=x[indices], y=y[indices])
+
+    return fig
@@ -0,0 +1,268 @@
+import codecs
+import contextlib
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Chart pages change at most once a day, so every body is kept on disk together
+# with its validators and revalidated with a conditional request
+CACHE_DIR = os.environ.get(
+    "ONCHAIN_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "http"),
+)
+
+# Seconds to wait for a connection and then for each read of the response
+CONNECT_TIMEOUT = float(os.environ.get("ONCHAIN_CONNECT_TIMEOUT", 5))
+TIMEOUT = float(os.environ.get("ONCHAIN_READ_TIMEOUT", 30))
+
+# Attempts after the first one for connection errors, timeouts and 429/5xx
+# responses, each after a random wait of up to BACKOFF * 2 ** attempt seconds
+RETRIES = int(os.environ.get("ONCHAIN_RETRIES", 3))
+BACKOFF = float(os.environ.get("ONCHAIN_BACKOFF", 0.5))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests in flight per host; also the number of kept-alive connections per host
+MAX_PER_HOST = int(os.environ.get("ONCHAIN_MAX_PER_HOST", 4))
+
+# Bytes read from the socket (after decompression) or the cache file at a time
+CHUNK_SIZE = 64 * 1024
+
+# One session for every upstream, so each host's connections are reused across fetches
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=MAX_PER_HOST, pool_block=True)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+_lock = threading.Lock()
+_hosts = {}  # host -> semaphore bounding its requests in flight
+
+# hits: served from disk after a 304, misses: full download,
+# stale: served from disk because the upstream request failed,
+# retries: attempts repeated after a transient failure
+_stats = {"hits": 0, "misses": 0, "stale": 0, "retries": 0}
+
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".body"), os.path.join(CACHE_DIR, key + ".json")
+
+
+def _read_meta(url):
+    body_path, meta_path = _cache_paths(url)
+    if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_meta(url, meta):
+    _, meta_path = _cache_paths(url)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
+
+
+def _host_slot(url):
+    host = urlsplit(url).netloc
+    with _lock:
+        slot = _hosts.get(host)
+        if slot is None:
+            slot = _hosts[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+    return slot
+
+
+def _retry_delay(attempt, response=None):
+    # Full jitter, so workers that failed together do not retry together
+    delay = random.uniform(0, BACKOFF * 2 ** attempt)
+    if response is not None:
+        try:
+            delay = max(delay, min(float(response.headers.get("Retry-After", 0)), 60))
+        except ValueError:
+            pass
+    return delay
+
+
+def _get(url, headers, timeout, stream=False):
+    # GET url through the shared session, retrying transient failures with backoff
+    for attempt in range(RETRIES + 1):
+        response = None
+        try:
+            with _host_slot(url):
+                response = _session.get(url, headers=headers, timeout=(CONNECT_TIMEOUT, timeout), stream=stream)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+            response.close()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == RETRIES:
+                raise
+        _count("retries")
+        time.sleep(_retry_delay(attempt, response))
+
+
+def _cached_chunks(url, meta):
+    body_path, _ = _cache_paths(url)
+    decoder = codecs.getincrementaldecoder(meta["encoding"])(errors="replace")
+    with open(body_path, "rb") as f:
+        for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+            yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def _cached_digest(url, meta):
+    # Bodies cached before digests were recorded are hashed once on first use
+    if "digest" not in meta:
+        body_path, _ = _cache_paths(url)
+        body_hash = hashlib.blake2b(digest_size=16)
+        with open(body_path, "rb") as f:
+            for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+                body_hash.update(data)
+        meta["digest"] = body_hash.hexdigest()
+        _write_meta(url, meta)
+    return meta["digest"]
+
+
+def _downloaded_chunks(url, response):
+    # Decode the body as it arrives while writing it to the cache; the metadata
+    # is only written once the whole body is on disk
+    encoding = response.encoding or "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    body_hash = hashlib.blake2b(digest_size=16)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path, _ = _cache_paths(url)
+    tmp_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with response, open(tmp_path, "wb") as f:
+            for data in response.iter_content(CHUNK_SIZE):
+                f.write(data)
+                body_hash.update(data)
+                yield decoder.decode(data)
+        os.replace(tmp_path, body_path)
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+    yield decoder.decode(b"", final=True)
+
+    now = time.time()
+    _write_meta(url, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "encoding": encoding,
+        "digest": body_hash.hexdigest(),
+        "fetched_at": now,
+        "checked_at": now,
+    })
+    _count("misses")
+
+
+def _open(url, timeout):
+    # Return the body of url as text chunks, from upstream or the disk cache,
+    # and the cache metadata when it is served from the cache
+    meta = _read_meta(url)
+
+    # Ask upstream whether our copy is still current
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = _get(url, headers, timeout, stream=True)
+        if response.status_code in RETRY_STATUSES:
+            response.close()
+            response.raise_for_status()
+    except requests.RequestException:
+        if meta is None:
+            raise
+        _count("stale")
+        return _cached_chunks(url, meta), meta
+
+    if response.status_code == 304 and meta is not None:
+        response.close()
+        meta["checked_at"] = time.time()
+        _write_meta(url, meta)
+        _count("hits")
+        return _cached_chunks(url, meta), meta
+
+    if not response.ok:
+        response.close()
+        response.raise_for_status()
+    return _downloaded_chunks(url, response), None
+
+
+def stream(url, consume, timeout=TIMEOUT, unless_digest=None):
+    """Return consume(chunks), where chunks yields the body of url as decoded text.
+
+    The body is decompressed and decoded as it arrives, so consume can start
+    parsing before the download ends. Whatever consume leaves unread is still
+    written to the disk cache, without being held in memory. If the body is
+    served from the cache and its digest is unless_digest, consume is not
+    called and None is returned.
+    """
+    chunks, meta = _open(url, timeout)
+    if meta is not None and unless_digest is not None and _cached_digest(url, meta) == unless_digest:
+        return None
+
+    try:
+        return consume(chunks)
+    except requests.RequestException:
+        # The connection failed part way through the body: serve our last copy
+        meta = _read_meta(url)
+        if meta is None:
+            raise
+        _count("stale")
+        return consume(_cached_chunks(url, meta))
+    finally:
+        # Nothing is waiting on the rest of the body, so a failure here only skips caching it
+        with contextlib.suppress(requests.RequestException):
+            for _ in chunks:
+                pass
+
+
+def fetch(url, timeout=TIMEOUT):
+    """Return the body of url as text, served from the disk cache when unchanged."""
+    return stream(url, "".join, timeout)
+
+
+def digest(url):
+    """Return the blake2b digest of the cached body of url, or None."""
+    meta = _read_meta(url)
+    if meta is None:
+        return None
+    return _cached_digest(url, meta)
+
+
+def cache_age(url):
+    """Return the seconds since the cached body of url was downloaded, or None."""
+    meta = _read_meta(url)
+    if meta is None:
+        return None
+    return time.time() - meta["fetched_at"]
+
+
+def cache_stats():
+    """Return a copy of the hit/miss/retry counters."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,124 @@
+import collections
+import copy
+import functools
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+import plotly.graph_objs as go
+
+# Figures kept across reruns and sessions; each is a plain dict of a few hundred KB
+MAX_FIGURES = int(os.environ.get("ONCHAIN_FIGURE_CACHE_SIZE", 64))
+
+_lock = threading.Lock()
+_figures = collections.OrderedDict()
+# Figures as shown, by (figure key, render parameters): trimming and downsampling
+# a figure costs more than serializing it, so it is done once per viewport
+_rendered = collections.OrderedDict()
+_stats = {"hits": 0, "misses": 0, "build_seconds": 0.0, "saved_seconds": 0.0, "rendered_hits": 0}
+
+
+def _content_hash(value):
+    # Frames are keyed on their contents, so a reload with the same data still hits
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.blake2b(digest_size=16)
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr(list(labels)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+    return repr(value)
+
+
+def _figure_dict(fig):
+    # Figure.to_dict() base64-encodes every array, which downsample_figure cannot
+    # read back; the traces' and layout's own JSON keeps the NumPy arrays
+    return {
+        "data": [trace.to_plotly_json() for trace in fig.data],
+        "layout": fig.layout.to_plotly_json(),
+    }
+
+
+def cached(builder):
+    """Cache the figures builder returns by (builder, dataset hash, parameters).
+
+    The figure is stored as a dict and rebuilt without Plotly's validation on a
+    hit, which skips both the builder and the validators. Every call gets its
+    own copy, so callers can trim and downsample it in place.
+    """
+    name = f"{builder.__module__}.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (
+            name,
+            tuple(_content_hash(arg) for arg in args),
+            tuple(sorted((k, _content_hash(v)) for k, v in kwargs.items())),
+        )
+
+        with _lock:
+            entry = _figures.get(key)
+            if entry is not None:
+                _figures.move_to_end(key)
+                _stats["hits"] += 1
+                _stats["saved_seconds"] += entry[1]
+
+        if entry is not None:
+            fig = go.Figure(copy.deepcopy(entry[0]), _validate=False)
+            fig._figure_cache_key = key
+            return fig
+
+        started = time.perf_counter()
+        fig = builder(*args, **kwargs)
+        fig_dict = _figure_dict(fig)
+        elapsed = time.perf_counter() - started
+        fig._figure_cache_key = key
+
+        with _lock:
+            _stats["misses"] += 1
+            _stats["build_seconds"] += elapsed
+            _figures[key] = (fig_dict, elapsed)
+            while len(_figures) > MAX_FIGURES:
+                _figures.popitem(last=False)
+
+        return fig
+
+    return wrapper
+
+
+def rendered(fig, params, render):
+    """Return render(fig), reusing it for every figure of the same cached build and params.
+
+    params (hashable) must hold everything render depends on besides fig.
+    Figures that did not come from a cached builder are rendered every time.
+    The result is shared between callers, so it must not be changed.
+    """
+    figure_key = getattr(fig, "_figure_cache_key", None)
+    if figure_key is None:
+        return render(fig)
+
+    key = (figure_key, params)
+    with _lock:
+        result = _rendered.get(key)
+        if result is not None:
+            _rendered.move_to_end(key)
+            _stats["rendered_hits"] += 1
+            return result
+
+    result = render(fig)
+    with _lock:
+        _rendered[key] = result
+        # A few viewports per figure
+        while len(_rendered) > 4 * MAX_FIGURES:
+            _rendered.popitem(last=False)
+    return result
+
+
+def stats():
+    """Return the hits, misses, hit rate, build seconds spent and saved and rendered hits so far."""
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+    return stats
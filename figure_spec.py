@@ -0,0 +1,59 @@
+import plotly.graph_objs as go
+
+# Every chart puts its legend in one row above the plot
+LEGEND = dict(
+    orientation='h',  # Horizontal layout
+    yanchor='bottom', # Anchor legend at the bottom
+    y=1.02,           # Position legend slightly above the plot
+    xanchor='center', # Anchor legend in the center
+    x=0.5             # Center the legend horizontally
+)
+
+
+def line(column, name, color, secondary_y=False, mode='lines'):
+    """Return the spec of a line trace drawing column of the frame."""
+    return dict(column=column, name=name, color=color, secondary_y=secondary_y, mode=mode)
+
+
+def build_figure(df, traces, y_title, y2_title=None, hlines=(), height=600):
+    """Compile a figure spec over df straight into a figure with a log price axis and a second y-axis.
+
+    traces is a list of line() specs and hlines a list of (y, color) dashed
+    lines on the second y-axis. The figure dict is built from NumPy arrays and
+    handed to Plotly without validation, which is what made the make_subplots
+    and go.Scatter builders slow.
+    """
+    x = df.index.to_numpy()
+
+    data = []
+    for spec in traces:
+        trace = dict(
+            line=dict(color=spec['color']),
+            name=spec['name'],
+            x=x,
+            y=df[spec['column']].to_numpy(),
+            type='scatter',
+            xaxis='x',
+            yaxis='y2' if spec['secondary_y'] else 'y',
+        )
+        if spec['mode'] is not None:
+            trace['mode'] = spec['mode']
+        data.append(trace)
+
+    # The same axes make_subplots(specs=[[{"secondary_y": True}]]) lays out
+    layout = dict(
+        xaxis=dict(anchor='y', domain=[0.0, 0.94], title=dict(text='Date')),
+        yaxis=dict(anchor='x', domain=[0.0, 1.0], title=dict(text=y_title), type='log', tickcolor='blue'),
+        yaxis2=dict(anchor='x', overlaying='y', side='right'),
+        legend=LEGEND,
+        height=height,
+    )
+    if y2_title is not None:
+        layout['yaxis2'].update(title=dict(text=y2_title), tickcolor='red')
+    if hlines:
+        layout['shapes'] = [
+            dict(line=dict(color=color, dash='dash'), type='line', x0=0, x1=1, xref='x domain', y0=y, y1=y, yref='y2')
+            for y, color in hlines
+        ]
+
+    return go.Figure(dict(data=data, layout=layout), _validate=False)
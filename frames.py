@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+
+def _to_values(y):
+    # Plotly writes gaps as null, which NumPy already reads as NaN; anything
+    # else non-numeric goes through pandas and is coerced to NaN as before
+    try:
+        return np.asarray(y, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(y), errors='coerce').to_numpy(dtype=float)
+
+
+# The dtype pandas parses date strings to; dates the chainexposed tokenizer has
+# already parsed are cast to it, so every source's index has the same unit
+_DATE_DTYPE = pd.to_datetime(['2000-01-01'], format='ISO8601').dtype
+
+
+def _same_values(a, b):
+    # x arrays come as lists from Plotly payloads and as NumPy arrays from chainexposed scripts
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+
+def build_frame(traces, columns, index_trace=None):
+    """Combine the traces named in columns into one frame.
+
+    columns maps upstream trace names to column names. The frame is indexed on
+    the dates of index_trace (default: the first trace in columns) and every
+    other trace is aligned onto those dates.
+    """
+    if index_trace is None:
+        index_trace = next(iter(columns))
+
+    # Later traces with the same name win, like the per-trace dict did
+    by_name = {}
+    for trace in traces:
+        if 'x' in trace and 'y' in trace:
+            by_name[trace.get('name', 'Unnamed Trace')] = trace
+
+    # Parse each distinct x array once; the traces on a chart almost always share dates
+    parsed = []
+
+    def dates_for(x):
+        for seen_x, dates in parsed:
+            if seen_x is x or (len(seen_x) == len(x) and _same_values(seen_x, x)):
+                return dates
+        if isinstance(x, np.ndarray) and x.dtype.kind == 'M':
+            dates = pd.DatetimeIndex(x.astype(_DATE_DTYPE), name='Date')
+        else:
+            dates = pd.DatetimeIndex(pd.to_datetime(x, format='ISO8601'), name='Date')
+        parsed.append((x, dates))
+        return dates
+
+    index = dates_for(by_name[index_trace]['x'])
+
+    # One column-major block, so each column is contiguous and the frame wraps it without copying
+    values = np.empty((len(columns), len(index))).T
+    for i, trace_name in enumerate(columns):
+        trace = by_name[trace_name]
+        dates = dates_for(trace['x'])
+        y = _to_values(trace['y'])
+        if dates is index:
+            values[:, i] = y
+        else:
+            values[:, i] = pd.Series(y, index=dates).reindex(index).to_numpy()
+
+    return pd.DataFrame(values, index=index, columns=list(columns.values()))
@@ -0,0 +1,90 @@
+import functools
+import logging
+import threading
+import time
+
+import sources
+
+LOGGER = logging.getLogger(__name__)
+
+# Every derived metric by name; inputs name either a source or another metric
+_nodes = {}
+_timings = {}
+_timings_lock = threading.Lock()
+
+
+class _Node:
+    def __init__(self, name, inputs, func):
+        self.name = name
+        self.inputs = inputs
+        self.func = func
+        self.lock = threading.Lock()
+        self.versions = None
+        self.value = None
+
+    def evaluate(self):
+        """Return the node's value and version, recomputing it only if an input changed."""
+        loaded = [_evaluate(name) for name in self.inputs]
+        versions = tuple(version for _, version in loaded)
+
+        with self.lock:
+            if self.versions != versions:
+                started = time.perf_counter()
+                self.value = self.func(*(value for value, _ in loaded))
+                self.versions = versions
+                _record(self.name, time.perf_counter() - started)
+            else:
+                _record(self.name, None)
+            # A metric's version is the versions of everything it was computed from
+            return self.value, (self.name, versions)
+
+
+def _evaluate(name):
+    node = _nodes.get(name)
+    if node is None:
+        return sources.load_versioned(name)
+    return node.evaluate()
+
+
+def _record(name, seconds):
+    with _timings_lock:
+        timing = _timings.setdefault(name, {"computed": 0, "reused": 0, "seconds": 0.0, "last_seconds": None})
+        if seconds is None:
+            timing["reused"] += 1
+        else:
+            timing["computed"] += 1
+            timing["seconds"] += seconds
+            timing["last_seconds"] = seconds
+            LOGGER.debug("Computed %s in %.3fs", name, seconds)
+
+
+def metric(*inputs):
+    """Declare the decorated function as a metric computed from the named sources and metrics.
+
+    The function receives its inputs as positional arguments and is called
+    without arguments. It runs once per version of its inputs, so only the
+    metrics downstream of a reloaded source are recomputed.
+    """
+    def decorator(func):
+        if func.__name__ in _nodes or func.__name__ in sources.SOURCES:
+            raise ValueError(f"Metric {func.__name__} is already defined")
+        node = _nodes[func.__name__] = _Node(func.__name__, inputs, func)
+
+        @functools.wraps(func)
+        def wrapper():
+            return node.evaluate()[0]
+
+        return wrapper
+
+    return decorator
+
+
+def graph():
+    """Return the inputs of every metric defined so far."""
+    return {name: node.inputs for name, node in _nodes.items()}
+
+
+def timings():
+    """Return how often each metric was computed and reused and the seconds its computations took."""
+    with _timings_lock:
+        return {name: dict(timing) for name, timing in _timings.items()}
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import store
+
+# Running count, mean and sum of squared deviations after every day of each
+# (series, start date), so a new day only has to be folded into the last state
+_lock = threading.Lock()
+_states = {}  # (series, start date) -> (state, rows of it that are stored)
+
+# Days folded in are kept in memory and the stored state is only rewritten once
+# this many of them have piled up, so a daily refresh does not rewrite all of it
+PERSIST_EVERY = int(os.environ.get("ONCHAIN_MOMENTS_PERSIST_EVERY", 30))
+
+
+def _store_name(name, start):
+    return f"moments-{name}-{start:%Y-%m-%d}"
+
+
+def _accumulate(values, count=0, mean=0.0, m2=0.0):
+    # Running sums of the deviations from a shift near the mean, which keep the
+    # variance accurate where plain sums of squares would cancel out. NaN days
+    # are skipped but still get the state so far, like pandas
+    finite = ~np.isnan(values)
+    shift = mean if count else (values[finite][0] if finite.any() else 0.0)
+    deviations = np.where(finite, values - shift, 0.0)
+    counts = count + np.cumsum(finite)
+    sums = count * (mean - shift) + np.cumsum(deviations)
+    squares = m2 + count * (mean - shift) ** 2 + np.cumsum(deviations * deviations)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, shift + sums / counts, mean)
+        m2s = np.where(counts > 0, np.maximum(squares - sums * sums / counts, 0.0), m2)
+    return counts.astype(float), means, m2s
+
+
+def _is_prefix(state, series):
+    # Stored days are never rewritten, so checking the last one is enough
+    n = len(state)
+    if n == 0 or n > len(series) or series.index[n - 1] != state.index[-1]:
+        return False
+    last, seen = series.iloc[n - 1], state['value'].iloc[-1]
+    return last == seen or (last != last and seen != seen)
+
+
+def running_moments(series, name=None):
+    """Return the expanding count, mean and sum of squared deviations of series.
+
+    The state is kept per (name, first date) and persisted at most every
+    PERSIST_EVERY days, so only the days after the last call are folded in.
+    """
+    if name is None:
+        name = series.name
+    key = (name, series.index[0])
+
+    with _lock:
+        state, stored_rows = _states.get(key, (None, 0))
+    if state is None:
+        state = store.read(_store_name(*key))
+        stored_rows = 0 if state is None else len(state)
+
+    if state is not None and _is_prefix(state, series):
+        new = series.iloc[len(state):]
+        if new.empty:
+            return state
+        last = state.iloc[-1]
+        values = new.to_numpy(dtype=float)
+        counts, means, m2s = _accumulate(values, last['count'], last['mean'], last['m2'])
+        columns = {'value': values, 'count': counts, 'mean': means, 'm2': m2s}
+        state = pd.DataFrame(
+            {column: np.concatenate([state[column].to_numpy(), columns[column]]) for column in columns},
+            index=state.index.append(new.index),
+        )
+    else:
+        stored_rows = 0
+        values = series.to_numpy(dtype=float)
+        counts, means, m2s = _accumulate(values)
+        state = pd.DataFrame({'value': values, 'count': counts, 'mean': means, 'm2': m2s}, index=series.index)
+
+    # A restart folds the days missing from the stored state back in, so it can lag behind
+    if stored_rows == 0 or len(state) - stored_rows >= PERSIST_EVERY:
+        store.write(_store_name(*key), state)
+        stored_rows = len(state)
+    with _lock:
+        _states[key] = (state, stored_rows)
+    return state
+
+
+def band_name(multiplier):
+    """Return the column name the charts use for the band at multiplier σ."""
+    return f"Mean {'+' if multiplier >= 0 else '-'} {abs(multiplier):g}σ"
+
+
+def expanding_mean_std(series, name=None):
+    """Return the expanding mean and standard deviation (ddof=1) of series as arrays."""
+    state = running_moments(series, name)
+    counts = state['count'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(counts >= 1, state['mean'].to_numpy(), np.nan)
+        std = np.where(counts >= 2, np.sqrt(state['m2'].to_numpy() / (counts - 1)), np.nan)
+    return mean, std
+
+
+def expanding_bands(series, multipliers, name=None):
+    """Return the expanding mean + multiplier * std bands of series, one column each.
+
+    Matches series.expanding().mean() + series.expanding().std() * multiplier
+    to floating point tolerance, from a single pass over the days not seen yet.
+    """
+    mean, std = expanding_mean_std(series, name)
+    return pd.DataFrame(
+        {band_name(multiplier): mean + (std * multiplier) for multiplier in multipliers},
+        index=series.index,
+    )
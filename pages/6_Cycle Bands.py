@@ -1,31 +1,48 @@
 import streamlit as st
+import refresher
+import utils
 from price_models import get_dataframe, create_cycle_bands_plot, create_norm_plot, create_transformed_cycle, create_all_cycle_bands
 
-df_cycles = get_dataframe()
+# Keep every source warm in the background; this page only waits on its own
+refresher.start()
+
+x_range = utils.viewport()
+
+FIGURE_BUILDERS = {
+    "all_cycle_bands": create_all_cycle_bands,
+    "cycle_bands": create_cycle_bands_plot,
+    "norm": create_norm_plot,
+    "transformed_cycle": create_transformed_cycle,
+}
+
+
+def load_figure(name):
+    return FIGURE_BUILDERS[name](get_dataframe())
+
 
 st.subheader("All Cycle Band Metrics")
-fig_all = create_all_cycle_bands(df_cycles)
+fig_all = load_figure("all_cycle_bands")
 
-st.plotly_chart(fig_all, use_container_width=True)
+utils.plotly_chart(fig_all, x_range, use_container_width=True)
 
 st.subheader(f"Cycle Bands Avg Peaks & Troughs")
 
 # Call the function to create the plot
-fig_cycles = create_cycle_bands_plot(df_cycles)
+fig_cycles = load_figure("cycle_bands")
 
 # Show the figure
-st.plotly_chart(fig_cycles, use_container_width=True)
+utils.plotly_chart(fig_cycles, x_range, use_container_width=True)
 
 st.subheader(f"Normalized Cycle Bands")
 # Call the function to create the plot
-fig_norm_cycles = create_norm_plot(df_cycles)
+fig_norm_cycles = load_figure("norm")
 
 # Show the figure
-st.plotly_chart(fig_norm_cycles, use_container_width=True)
+utils.plotly_chart(fig_norm_cycles, x_range, use_container_width=True)
 
 st.subheader(f"Normalized Transformed Cycle Bands")
 # Call the function to create the plot
-fig_transf_cycles = create_transformed_cycle(df_cycles)
+fig_transf_cycles = load_figure("transformed_cycle")
 
 # Show the figure
-st.plotly_chart(fig_transf_cycles, use_container_width=True)
\ No newline at end of file
+utils.plotly_chart(fig_transf_cycles, x_range, use_container_width=True)
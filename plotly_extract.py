@@ -0,0 +1,430 @@
+import json
+import re
+
+import numpy as np
+from bs4 import BeautifulSoup as bs
+
+# One decoder shared by every loader; raw_decode parses straight out of the
+# page text starting at an offset, so the trace array is never sliced or copied
+_decoder = json.JSONDecoder()
+
+PLOTLY_MARKER = 'Plotly.newPlot('
+VAR_TRACE_MARKER = 'var trace'
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _skip_whitespace(text, index):
+    return _WHITESPACE.match(text, index).end()
+
+
+def _skip_value(text, index):
+    # Flat arrays of numbers or date strings end at the first ']', so they can be
+    # stepped over with str.find instead of being decoded into Python lists
+    if text[index] == '[':
+        end = text.find(']', index)
+        if (end != -1 and text.find('[', index + 1, end) == -1 and text.find('{', index + 1, end) == -1
+                and text.count('"', index, end) % 2 == 0):
+            after = _skip_whitespace(text, end + 1)
+            if after < len(text) and text[after] in ',}':
+                return end + 1
+
+    # Anything else (nested arrays, objects, an odd quote count from a ']' inside
+    # a string) is decoded normally
+    _, end = _decoder.raw_decode(text, index)
+    return end
+
+
+def _scan_trace(text, index):
+    # Decode the scalar fields of the trace object at index and record where each
+    # array or object field sits, without decoding those yet
+    fields = {}
+    spans = {}
+
+    index = _skip_whitespace(text, index + 1)
+    if text[index] == '}':
+        return fields, spans, index + 1
+
+    while True:
+        key, index = _decoder.raw_decode(text, index)
+        index = _skip_whitespace(text, index)
+        if text[index] != ':':
+            raise ValueError(f"Expected ':' at position {index}.")
+        index = _skip_whitespace(text, index + 1)
+
+        if text[index] in '[{':
+            end = _skip_value(text, index)
+            spans[key] = (index, end)
+        else:
+            fields[key], end = _decoder.raw_decode(text, index)
+
+        index = _skip_whitespace(text, end)
+        if text[index] == ',':
+            index = _skip_whitespace(text, index + 1)
+        elif text[index] == '}':
+            return fields, spans, index + 1
+        else:
+            raise ValueError(f"Expected ',' or '}}' at position {index}.")
+
+
+def _scan_element(text, index, names):
+    # Find the end of the array element at index and whether it is one of the
+    # named traces, then step past the ',' or ']' after it. Returns whether it
+    # is wanted, where it ends, the next index and whether the array ended.
+    if names is None:
+        wanted, end = True, _skip_value(text, index)
+    elif text[index] == '{':
+        fields, _, end = _scan_trace(text, index)
+        wanted = fields.get('name', 'Unnamed Trace') in names
+    else:
+        wanted, end = False, _skip_value(text, index)
+
+    index = _skip_whitespace(text, end)
+    if text[index] == ',':
+        return wanted, end, _skip_whitespace(text, index + 1), False
+    if text[index] == ']':
+        return wanted, end, index + 1, True
+    raise ValueError(f"Expected ',' or ']' at position {index}.")
+
+
+def _decode_element(text, index, names):
+    # Decode a wanted element; traces picked by name only have their array fields
+    # decoded now, after _scan_trace has read the scalars
+    if names is None:
+        return _decoder.raw_decode(text, index)[0]
+    fields, spans, _ = _scan_trace(text, index)
+    for key, (start, _) in spans.items():
+        fields[key], _ = _decoder.raw_decode(text, start)
+    return fields
+
+
+def _scan_traces(text, index, names):
+    # Walk the trace array at index and fully decode only the traces named in names
+    traces = []
+
+    index = _skip_whitespace(text, index + 1)
+    if text[index] == ']':
+        return traces
+
+    while True:
+        start = index
+        wanted, _, index, done = _scan_element(text, index, names)
+        if wanted:
+            traces.append(_decode_element(text, start, names))
+        if done:
+            return traces
+
+
+def extract_plotly_data(text, start=0, names=None):
+    """Return the list of traces passed to the first Plotly.newPlot( call in text.
+
+    If names is given, only the traces with those names are returned and the
+    arrays of every other trace are skipped without being decoded.
+    """
+    # Find the start of the JSON-like structure by looking for 'Plotly.newPlot('
+    start_index = text.find(PLOTLY_MARKER, start)
+    if start_index == -1:
+        raise ValueError("Could not find 'Plotly.newPlot(' in the script content.")
+
+    # The first '[' after 'Plotly.newPlot(' opens the data array
+    start_index = text.find('[', start_index + len(PLOTLY_MARKER))
+    if start_index == -1:
+        raise ValueError("Could not find the start of the data array.")
+
+    # Decode the array in place; the decoder stops at the matching ']'
+    try:
+        if names is None:
+            data, _ = _decoder.raw_decode(text, start_index)
+        else:
+            data = _scan_traces(text, start_index, names)
+    except (json.JSONDecodeError, IndexError) as e:
+        raise ValueError(f"JSON decode error: {e}") from e
+
+    return data
+
+
+def stream_plotly_payload(chunks, names=None):
+    """Return the text of each trace of the first Plotly.newPlot( call in a page read as text chunks.
+
+    Only the traces in names (default: all) are kept. Text before the call is
+    dropped as it arrives, the text of every other trace as soon as it is
+    complete, and no chunk after the data array is read. decode_plotly_payload
+    turns the result into the traces extract_plotly_data would return.
+    """
+    chunks = iter(chunks)
+    pending = []
+    text = ''
+    ended = False
+
+    def read(size):
+        # Join chunks onto text until it holds size characters or the page ends
+        nonlocal text, ended
+        available = len(text) + sum(map(len, pending))
+        while available < size and not ended:
+            chunk = next(chunks, None)
+            if chunk is None:
+                ended = True
+            else:
+                pending.append(chunk)
+                available += len(chunk)
+        text = ''.join([text, *pending])
+        pending.clear()
+
+    def parse(step):
+        # Run step on text, reading more whenever it runs off the end. Each retry
+        # waits for twice the text, so retries cost at most as much as one parse.
+        while True:
+            try:
+                return step()
+            except (ValueError, IndexError) as e:
+                if ended:
+                    raise ValueError(f"JSON decode error: {e}") from e
+                read(2 * len(text) + 1)
+
+    # Skip ahead to the call, keeping only a marker's length of text between chunks
+    while True:
+        index = text.find(PLOTLY_MARKER)
+        if index != -1:
+            text = text[index + len(PLOTLY_MARKER):]
+            break
+        if ended:
+            raise ValueError("Could not find 'Plotly.newPlot(' in the script content.")
+        text = text[-len(PLOTLY_MARKER):]
+        read(len(text) + 1)
+
+    # The first '[' after 'Plotly.newPlot(' opens the data array
+    while True:
+        index = text.find('[')
+        if index != -1:
+            break
+        if ended:
+            raise ValueError("Could not find the start of the data array.")
+        read(len(text) + 1)
+
+    def first():
+        start = _skip_whitespace(text, index + 1)
+        return start, text[start] == ']'
+
+    index, done = parse(first)
+    payload = []
+    while not done:
+        wanted, end, next_index, done = parse(lambda: _scan_element(text, index, names))
+        if wanted:
+            payload.append(text[index:end])
+        # Drop the text of the element just scanned
+        text = text[next_index:]
+        index = 0
+
+    return payload
+
+
+def decode_plotly_payload(payload, names=None):
+    """Return the traces whose text stream_plotly_payload returned, decoding each one."""
+    try:
+        return [_decode_element(element, 0, names) for element in payload]
+    except (json.JSONDecodeError, IndexError) as e:
+        raise ValueError(f"JSON decode error: {e}") from e
+
+
+def stream_plotly_data(chunks, names=None):
+    """Return the traces of the first Plotly.newPlot( call in a page read as text chunks.
+
+    Gives the same result as extract_plotly_data on the whole page without
+    holding the page in memory; see stream_plotly_payload.
+    """
+    return decode_plotly_payload(stream_plotly_payload(chunks, names), names)
+
+
+def find_script(html, marker):
+    """Return the body of the <script> tag in html that contains marker, or None."""
+    marker_index = html.find(marker)
+    if marker_index == -1:
+        return None
+
+    # Walk back to the opening tag and forward to the closing tag around the marker
+    open_index = html.rfind('<script', 0, marker_index)
+    if open_index == -1:
+        return None
+    body_start = html.find('>', open_index, marker_index)
+    body_end = html.find('</script>', marker_index)
+    if body_start == -1 or body_end == -1:
+        return None
+
+    # The marker must sit inside that tag, not after an earlier </script>
+    if html.find('</script>', body_start, marker_index) != -1:
+        return None
+
+    return html[body_start + 1:body_end]
+
+
+def load_script(html, marker, features="html.parser"):
+    """Return the body of the first <script> tag in html that contains marker."""
+    script = find_script(html, marker)
+    if script is not None:
+        return script
+
+    # Fall back to building the DOM when the page layout is not what we expect
+    soup = bs(html, features)
+    for script_tag in soup.find_all("script"):
+        if marker in script_tag.text:
+            return script_tag.text
+
+    raise ValueError(f"Could not find a <script> tag containing {marker!r}.")
+
+
+def load_plotly_data(html, names=None):
+    """Return the Plotly traces embedded in a checkonchain chart page.
+
+    names limits the result to the named traces, as in extract_plotly_data.
+    """
+    # Fast path: decode the payload straight out of the page text, no DOM
+    try:
+        data = extract_plotly_data(html, names=names)
+        if isinstance(data, list) and all(isinstance(trace, dict) for trace in data):
+            return data
+    except ValueError:
+        pass
+
+    # Fall back to the third <script> tag, which holds the Plotly data
+    soup = bs(html, "lxml")
+    raw_data = soup.find_all("script")[2]
+    return extract_plotly_data(raw_data.string, names=names)
+
+
+# chainexposed pages declare each trace as a JS object literal, e.g.
+#   var trace0 = {x: ["2010-07-18", ...], y: [4.5, null, ...], name: 'Price', type: 'scatter'};
+# Keys are bare words and strings may be single quoted, so it is not JSON
+_JS_KEY = re.compile(r'[ \t\n\r]*([A-Za-z_$][\w$]*|"[^"]*"|\'[^\']*\')[ \t\n\r]*:[ \t\n\r]*')
+_JS_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_JS_WORD = re.compile(r'[^,}\]\s]+')
+_JS_BRACKETS = re.compile(r'[\[\]{}\'"]')
+
+
+def _js_value_end(script, index):
+    # Step over the JS value at index; flat arrays end at the first ']', the
+    # rest is walked bracket by bracket, skipping over strings
+    char = script[index]
+    if char in '\'"':
+        return _JS_STRING.match(script, index).end()
+    if char not in '[{':
+        return _JS_WORD.match(script, index).end()
+
+    if char == '[':
+        end = script.find(']', index)
+        if (end != -1 and script.find('[', index + 1, end) == -1 and script.find('{', index + 1, end) == -1
+                and script.count('"', index, end) % 2 == 0 and script.count("'", index, end) % 2 == 0):
+            return end + 1
+
+    depth = 0
+    while True:
+        match = _JS_BRACKETS.search(script, index)
+        if match is None:
+            raise ValueError(f"Unterminated value at position {index}.")
+        if match.group() in '\'"':
+            index = _JS_STRING.match(script, match.start()).end()
+            continue
+        depth += 1 if match.group() in '[{' else -1
+        index = match.end()
+        if depth == 0:
+            return index
+
+
+def _scan_js_object(script, index):
+    # Record where the value of every key of the object literal at index sits,
+    # without converting any of them
+    spans = {}
+    index += 1
+    while True:
+        index = _skip_whitespace(script, index)
+        if script[index] == '}':
+            return spans, index + 1
+
+        match = _JS_KEY.match(script, index)
+        if match is None:
+            raise ValueError(f"Expected a key at position {index}.")
+        end = _js_value_end(script, match.end())
+        spans[match.group(1).strip('\'"')] = (match.end(), end)
+
+        index = _skip_whitespace(script, end)
+        if script[index] == ',':
+            index += 1
+        elif script[index] != '}':
+            raise ValueError(f"Expected ',' or '}}' at position {index}.")
+
+
+def _js_fixed_width_dates(body):
+    # Quoted dates of one width with one separator between them, as chainexposed
+    # writes them, are cut out of the raw bytes and parsed by NumPy in one call
+    width = body.find('"', 1) + 1
+    stride = body.find('"', width)
+    if body[0] != '"' or width < 3 or (stride == -1 and len(body) != width):
+        return None
+    if stride == -1:
+        stride = len(body)
+    encoded = (body + body[width:stride]).encode('ascii')
+    if len(encoded) % stride:
+        return None
+
+    cells = np.frombuffer(encoded, dtype='S1').reshape(-1, stride)
+    if not ((cells[:, 0] == b'"').all() and (cells[:, width - 1] == b'"').all()
+            and (cells[:, width:] == cells[0, width:]).all()):
+        return None
+    return np.ascontiguousarray(cells[:, 1:width - 1]).view(f'S{width - 2}').ravel().astype('datetime64')
+
+
+def _js_array(script, start, end):
+    # Convert a flat array literal straight to a NumPy array; numbers go through
+    # np.fromstring and dates through _js_fixed_width_dates
+    body = script[start + 1:end - 1].strip()
+    if not body:
+        return np.array([], dtype=float)
+    try:
+        if body[0] == '"':
+            values = _js_fixed_width_dates(body)
+        else:
+            # Unparseable text raises; a count that falls short catches anything read in part
+            values = np.fromstring(body.replace('null', 'nan'), dtype=float, sep=',')
+            if len(values) != body.count(',') + 1:
+                values = None
+        if values is not None:
+            return values
+    except (ValueError, UnicodeEncodeError):
+        pass
+
+    # Anything else (times, non-ASCII text, mixed types) is decoded as JSON
+    values = json.loads(script[start:end])
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.asarray(values)
+
+
+def extract_var_traces(script, names=None):
+    """Return the name, x and y of every 'var trace' object in a chainexposed script.
+
+    The script is walked once; x and y come back as NumPy arrays (dates as
+    datetime64) and are only converted for traces in names, if given.
+    """
+    traces = []
+
+    index = script.find(VAR_TRACE_MARKER)
+    while index != -1:
+        start = script.find('{', index)
+        if start == -1:
+            break
+        spans, end = _scan_js_object(script, start)
+
+        name = ''
+        if 'name' in spans:
+            name = script[slice(*spans['name'])].strip('\'"')
+        if names is None or name in names:
+            traces.append({
+                'x': _js_array(script, *spans['x']) if 'x' in spans else np.array([], dtype=float),
+                'y': _js_array(script, *spans['y']) if 'y' in spans else np.array([], dtype=float),
+                'name': name,
+            })
+
+        index = script.find(VAR_TRACE_MARKER, end)
+
+    return traces
@@ -1,309 +1,237 @@
-import json
-from bs4 import BeautifulSoup as bs
-import requests
 import pandas as pd
-import plotly.graph_objs as go
-from plotly.subplots import make_subplots
 import numpy as np
+import figure_cache
+from figure_spec import build_figure, line
+import metrics
+
+
+# The source columns the kernel reads, in the order of its input block
+PRICE_COLUMNS = [
+    'BTC Price', 'Cointime Price', 'Delta Price', 'Vaulted Price',
+    'Realized Price', 'Balanced Price', 'True Mean Price',
+]
+
+# The float columns the kernel writes; 'Row Number' is inserted before 'Overbought'
+DERIVED_COLUMNS = [
+    'Delta Top', 'Vaulted Top', 'Transferred Price', 'Terminal Price',
+    'Transferred Price AVIV', 'Terminal Price AVIV', 'Avg Top', 'Avg Bot',
+    'Normalized Price', 'Overbought', 'Oversold', 'Adjusted Normalized Price',
+]
+
+
+def _nanmean3(a, b, c, out, count):
+    # Same arithmetic as DataFrame.mean(axis=1): NaNs count as 0 in ((a + b) + c) / count
+    np.copyto(count, 0.0)
+    np.copyto(out, 0.0)
+    for values in (a, b, c):
+        present = ~np.isnan(values)
+        count += present
+        np.add(out, values, out=out, where=present)
+    with np.errstate(invalid='ignore'):
+        out /= count
+    # 0 / 0 is a negative NaN on most CPUs; pandas writes np.nan for empty rows
+    out[count == 0] = np.nan
+
+
+def cycle_bands(prices, out, start_row=0):
+    """Compute every derived cycle-band column from a block of PRICE_COLUMNS in one pass.
+
+    prices is an (n, 7) array; the results are written into out, an (n, 12)
+    array of DERIVED_COLUMNS. start_row is the 'Row Number' of the first day,
+    so appended days continue the overbought and oversold curves. Returns the
+    row numbers.
+    """
+    btc, cointime, delta, vaulted, realized, balanced, true_mean = prices.T
+    (delta_top, vaulted_top, transferred, terminal, transferred_aviv, terminal_aviv,
+     top, bot, normalized, overbought, oversold, adjusted) = out.T
+    scratch = np.empty(len(prices))
+
+    np.multiply(delta, 7, out=delta_top)
+    np.multiply(vaulted, 1.75, out=vaulted_top)
+    np.subtract(realized, balanced, out=transferred)
+    np.multiply(transferred, 21, out=terminal)
+    np.subtract(true_mean, balanced, out=transferred_aviv)
+    np.multiply(transferred_aviv, 6, out=terminal_aviv)
+
+    _nanmean3(vaulted_top, terminal_aviv, delta_top, out=top, count=scratch)
+    _nanmean3(delta, cointime, realized, out=bot, count=scratch)
+
+    np.subtract(btc, bot, out=normalized)
+    np.subtract(top, bot, out=scratch)
+    normalized /= scratch
+
+    # Define the overbought and oversold functions using the row numbers
+    rows = np.arange(start_row, start_row + len(prices))
+    np.multiply(1.1, rows, out=overbought)
+    overbought += 4000
+    np.log(overbought, out=overbought)
+    np.negative(overbought, out=overbought)
+    overbought += 9.8
+    np.multiply(0.25, rows, out=oversold)
+    oversold += 11000
+    np.log(oversold, out=oversold)
+    oversold -= 9.4
+
+    # The Adjusted Normalized Price fluctuates between the overbought and oversold curves
+    np.subtract(normalized, oversold, out=adjusted)
+    np.subtract(overbought, oversold, out=scratch)
+    adjusted /= scratch
+
+    return rows
+
+
+def _block(rows):
+    # Column-major, so each column is contiguous and a frame wraps it without copying
+    return np.empty((rows, len(PRICE_COLUMNS) + len(DERIVED_COLUMNS)), order='F')
+
+
+def _wrap(block, index):
+    n = len(index)
+    df = pd.DataFrame(block[:n], index=index, columns=PRICE_COLUMNS + DERIVED_COLUMNS, copy=False)
+    df.insert(df.columns.get_loc('Overbought'), 'Row Number', np.arange(n))
+    return df
+
+
+def _prices(combined_df):
+    # onchain_originals holds just these columns, so its values come without a copy
+    if list(combined_df.columns) == PRICE_COLUMNS:
+        return combined_df.to_numpy()
+    return combined_df[PRICE_COLUMNS].to_numpy()
+
+
+def _fill(block, prices, start):
+    # Write the prices of the days from row start on and compute their bands next to them
+    n_prices = len(PRICE_COLUMNS)
+    end = start + len(prices)
+    block[start:end, :n_prices] = prices
+    cycle_bands(block[start:end, :n_prices], out=block[start:end, n_prices:], start_row=start)
+
+
+def cycle_frame(combined_df):
+    """Return combined_df with every derived cycle-band column, built from one block."""
+    block = _block(len(combined_df))
+    _fill(block, _prices(combined_df), 0)
+    return _wrap(block, combined_df.index)
+
+
+class CycleFrame:
+    """The cycle-band frame of a price history that grows by a few days at a time.
+
+    Rows are kept in a block with spare rows at the end. extend() computes only
+    the days after the last one into those rows, continuing the row numbers,
+    and wraps the block as the new frame; frames it returned earlier wrap the
+    rows before and are left as they were.
+    """
+
+    def __init__(self):
+        self.block = None
+        self.frame = None
+
+    def _is_prefix(self, index, prices):
+        # The sources only append days, so only the last day computed is checked
+        n = len(self.frame)
+        if n == 0 or n > len(index) or index[n - 1] != self.frame.index[-1]:
+            return False
+        return np.array_equal(prices[n - 1], self.block[n - 1, :len(PRICE_COLUMNS)], equal_nan=True)
+
+    def extend(self, combined_df):
+        """Return cycle_frame(combined_df), computing only the days not seen yet."""
+        prices = _prices(combined_df)
+        total = len(prices)
+        if self.frame is None or not self._is_prefix(combined_df.index, prices):
+            n = 0
+            self.block = _block(total + total // 4)
+        else:
+            n = len(self.frame)
+            if n == total:
+                return self.frame
+            if total > len(self.block):
+                # Grow by a quarter, so daily appends only copy the block now and then
+                block = _block(total + total // 4)
+                block[:n] = self.block[:n]
+                self.block = block
+
+        _fill(self.block, prices[n:], n)
+        self.frame = _wrap(self.block, combined_df.index)
+        return self.frame
+
+
+_cycles = CycleFrame()
+
 
-# Fetch the webpage
-url = "https://charts.checkonchain.com/btconchain/pricing/pricing_onchainoriginals/pricing_onchainoriginals_light.html"
-raw = requests.get(url)
-soup = bs(raw.text, "lxml")
-
-# Find the <script> tag containing the Plotly data
-raw_data = soup.find_all("script")[2]
-string_data = str(raw_data).replace("\\", "")
-
-# Find the start of the JSON-like structure by looking for 'Plotly.newPlot('
-start_index = string_data.find('Plotly.newPlot(')
-if start_index != -1:
-    # Find the start of the data array by looking for the first '[' after 'Plotly.newPlot('
-    start_index = string_data.find('[', start_index)
-    # Find the end of the data array by looking for the matching ']' bracket
-    end_index = start_index
-    bracket_count = 1
-    while end_index < len(string_data) and bracket_count > 0:
-        end_index += 1
-        if string_data[end_index] == '[':
-            bracket_count += 1
-        elif string_data[end_index] == ']':
-            bracket_count -= 1
-
-    # Extract the JSON-like string and convert it to a Python object
-    if end_index < len(string_data):
-        data_json_string = string_data[start_index:end_index+1]
-        try:
-            data = json.loads(data_json_string)
-            # Now 'data' is a Python object, and you can extract the 'x' and 'y' values from each trace
-        except json.JSONDecodeError as e:
-            print("JSON decode error:", e)
-    else:
-        print("Could not find the end of the data array.")
-else:
-    print("Could not find 'Plotly.newPlot(' in the script content.")
-        
-# Initialize an empty dictionary to store the dataframes
-dataframes = {}
-
-# Iterate over each trace in the data
-for trace in data:
-    if 'x' in trace and 'y' in trace:
-        # Convert 'x' data to datetime and 'y' data to float, coercing errors to NaN
-        df = pd.DataFrame({
-            'Date': pd.to_datetime(trace['x']),
-            'Value': pd.to_numeric(trace['y'], errors='coerce')
-        }).set_index('Date')
-
-        # Use the trace name as the key in the dictionary of dataframes
-        trace_name = trace.get('name', 'Unnamed Trace')
-        dataframes[trace_name] = df
-
-# Now you have a dictionary of dataframes with datetime index and float values
-
-# Create a new DataFrame for the combined data
-combined_df = pd.DataFrame(index=dataframes['Price'].index)
-
-# Add the 'Y' data from each trace as a separate column in the combined DataFrame
-combined_df['BTC Price'] = dataframes['Price']['Value']
-combined_df['Cointime Price'] = dataframes['Cointime Price']['Value']
-combined_df['Delta Price'] = dataframes['Delta Price']['Value']
-combined_df['Vaulted Price'] = dataframes['Vaulted Price']['Value']
-combined_df['Realized Price'] = dataframes['Realized Price']['Value']
-combined_df['Balanced Price'] = dataframes['Balanced Price']['Value']
-combined_df['True Mean Price'] = dataframes['True Mean Price']['Value']
-combined_df['Delta Top'] = combined_df['Delta Price'] * 7
-combined_df['Vaulted Top'] = combined_df['Vaulted Price'] * 1.75
-combined_df['Transferred Price'] = combined_df['Realized Price'] - combined_df['Balanced Price']
-combined_df['Terminal Price'] = combined_df['Transferred Price'] * 21
-combined_df['Transferred Price AVIV'] = combined_df['True Mean Price'] - combined_df['Balanced Price']
-combined_df['Terminal Price AVIV'] = combined_df['Transferred Price AVIV'] * 6
-
-df = combined_df.copy()
-df = df[df.index >= pd.to_datetime('2012')]
-
-df['Avg Top'] = df[['Vaulted Top', 'Terminal Price AVIV', 'Delta Top']].mean(axis = 1)
-df['Avg Bot'] = df[['Delta Price', 'Cointime Price', 'Realized Price']].mean(axis = 1)
-
-df['Normalized Price'] = (df['BTC Price'] - df['Avg Bot']) / (df['Avg Top'] - df['Avg Bot'])
-
-# Calculate the row numbers based on the date index
-df['Row Number'] = np.arange(len(df))
-
-# Define the overbought and oversold functions using the row numbers
-df['Overbought'] = -np.log(1.1 * df['Row Number'] + 4000) + 9.8
-df['Oversold'] = np.log(0.25 * df['Row Number'] + 11000) - 9.4
-
-# Calculate the Adjusted Normalized Price to fluctuate between the overbought and oversold curves
-df['Adjusted Normalized Price'] = (df['Normalized Price'] - df['Oversold']) / (df['Overbought'] - df['Oversold'])
+@metrics.metric("onchain_originals")
+def get_dataframe(combined_df):
+    # Runs under the metric's lock, so the one CycleFrame is never extended twice at once
+    return _cycles.extend(combined_df[combined_df.index >= pd.to_datetime('2012')])
 
+
+# The kernel's intermediate columns, as metrics of their own that slice its frame
+
+@metrics.metric("get_dataframe")
+def terminal_prices(df):
+    return df[PRICE_COLUMNS + DERIVED_COLUMNS[:6]]
+
+
+@metrics.metric("get_dataframe")
+def avg_top(df):
+    return df['Avg Top']
+
+
+@metrics.metric("get_dataframe")
+def avg_bot(df):
+    return df['Avg Bot']
+
+
+@metrics.metric("get_dataframe")
+def normalized_price(df):
+    return df['Normalized Price']
+
+
+@metrics.metric("get_dataframe")
+def adjusted_normalized_price(df):
+    return df[['Normalized Price', 'Row Number', 'Overbought', 'Oversold', 'Adjusted Normalized Price']]
+
+
+@figure_cache.cached
 def create_all_cycle_bands(df):
     df = df[df.index >= pd.to_datetime('2012')]
-    # Assuming 'final_df' is your DataFrame and it has a 'Date' index in datetime format
-    # and columns named 'True Market Mean' and 'BTC Price'
-
-    # Plot the 'BTC Price' on a logarithmic scale and the standard deviation bands using Plotly
-    fig = go.Figure()
-
-    # Create a subplot with 2 y-axes
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add 'BTC Price' trace with a logarithmic scale
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['BTC Price'], name='BTC Price (log scale)', line=dict(color='blue')),
-        secondary_y=False,
-    )
-
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Terminal Price'], name='Terminal Price', mode='lines', line=dict(color='red')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Terminal Price AVIV'], name='Terminal Price AVIV', mode='lines', line=dict(color='black')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Balanced Price'], name='Balanced Price', mode='lines', line=dict(color='green')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Realized Price'], name='Realized Price', mode='lines', line=dict(color='indigo')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Delta Top'], name='Delta Top', mode='lines', line=dict(color='purple')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Vaulted Price'], name='Vaulted Price', mode='lines', line=dict(color='violet')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Vaulted Top'], name='Vaulted Top', mode='lines', line=dict(color='red')),
-        secondary_y=False,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Cointime Price'], name='Cointime Price', mode='lines', line=dict(color='orange')),
-        secondary_y=False,
-    )
-
-    # Set x-axis title
-    fig.update_xaxes(title_text='Date')
-
-    # Set y-axes titles
-    fig.update_yaxes(title_text='BTC Price (log scale)', secondary_y=False, type='log', tickcolor='blue')
-    # fig.update_yaxes(title_text='HODL Waves (BTC)', secondary_y=True, tickcolor='red')
-
-    # Set the title
-    fig.update_layout(height = 600,
-                      legend=dict(
-                        orientation='h',  # Horizontal layout
-                        yanchor='bottom', # Anchor legend at the bottom
-                        y=1.02,           # Position legend slightly above the plot
-                        xanchor='center', # Anchor legend in the center
-                        x=0.5             # Center the legend horizontally
-    ))
-
-    return fig
-
-def get_dataframe():
-    return df
-
 
+    # 'BTC Price' on a logarithmic scale with every price model on the same axis
+    return build_figure(df, [
+        line('BTC Price', 'BTC Price (log scale)', 'blue', mode=None),
+        line('Terminal Price', 'Terminal Price', 'red'),
+        line('Terminal Price AVIV', 'Terminal Price AVIV', 'black'),
+        line('Balanced Price', 'Balanced Price', 'green'),
+        line('Realized Price', 'Realized Price', 'indigo'),
+        line('Delta Top', 'Delta Top', 'purple'),
+        line('Vaulted Price', 'Vaulted Price', 'violet'),
+        line('Vaulted Top', 'Vaulted Top', 'red'),
+        line('Cointime Price', 'Cointime Price', 'orange'),
+    ], y_title='BTC Price (log scale)')
+
+@figure_cache.cached
 def create_cycle_bands_plot(df):
-    # Assuming 'df' is your DataFrame and it has a 'Date' index in datetime format
-    # and columns named 'True Market Mean' and 'BTC Price'
-
     # Filter the DataFrame for dates after 2012
     df = df[df.index >= pd.to_datetime('2012')]
 
-    # Create a subplot with 2 y-axes
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add 'BTC Price' trace with a logarithmic scale
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['BTC Price'], name='BTC Price (log scale)', line=dict(color='blue')),
-        secondary_y=False,
-    )
-
-    # Add 'Avg Top' trace
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Avg Top'], name='Avg Top', mode='lines', line=dict(color='red')),
-        secondary_y=False,
-    )
-
-    # Add 'Avg Bot' trace
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Avg Bot'], name='Avg Bot', mode='lines', line=dict(color='green')),
-        secondary_y=False,
-    )
-
-    # Set x-axis title
-    fig.update_xaxes(title_text='Date')
-
-    # Set y-axes titles
-    fig.update_yaxes(title_text='BTC Price (log scale)', secondary_y=False, type='log', tickcolor='blue')
-
-    # Set the title
-    fig.update_layout(height=600,
-                      legend=dict(
-                        orientation='h',  # Horizontal layout
-                        yanchor='bottom', # Anchor legend at the bottom
-                        y=1.02,           # Position legend slightly above the plot
-                        xanchor='center', # Anchor legend in the center
-                        x=0.5             # Center the legend horizontally
-    ))
-
-    return fig
+    return build_figure(df, [
+        line('BTC Price', 'BTC Price (log scale)', 'blue', mode=None),
+        line('Avg Top', 'Avg Top', 'red'),
+        line('Avg Bot', 'Avg Bot', 'green'),
+    ], y_title='BTC Price (log scale)')
 
+@figure_cache.cached
 def create_norm_plot(df):
-    fig = go.Figure()
-
-    # Create a subplot with 2 y-axes
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add 'BTC Price' trace with a logarithmic scale
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['BTC Price'], name='BTC Price (log scale)', line=dict(color='blue')),
-        secondary_y=False,
-    )
-
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Normalized Price'], name='Normalized Cycle Range', mode='lines', line=dict(color='purple')),
-        secondary_y=True,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Overbought'], name='Transformed Top', mode='lines', line=dict(color='red')),
-        secondary_y=True,
-    )
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Oversold'], name='Transformed Bottom', mode='lines', line=dict(color='green')),
-        secondary_y=True,
-    )
-
-    # Set x-axis title
-    fig.update_xaxes(title_text='Date')
-
-    # Set y-axes titles
-    fig.update_yaxes(title_text='BTC Price (log scale)', secondary_y=False, type='log', tickcolor='blue')
-    #fig.update_yaxes(title_text='HODL Waves (BTC)', secondary_y=True, tickcolor='red')
-
-    # Set the title
-    fig.update_layout(height=600,
-                      legend=dict(
-                        orientation='h',  # Horizontal layout
-                        yanchor='bottom', # Anchor legend at the bottom
-                        y=1.02,           # Position legend slightly above the plot
-                        xanchor='center', # Anchor legend in the center
-                        x=0.5             # Center the legend horizontally
-    ))
-
-    return fig
-
+    return build_figure(df, [
+        line('BTC Price', 'BTC Price (log scale)', 'blue', mode=None),
+        line('Normalized Price', 'Normalized Cycle Range', 'purple', secondary_y=True),
+        line('Overbought', 'Transformed Top', 'red', secondary_y=True),
+        line('Oversold', 'Transformed Bottom', 'green', secondary_y=True),
+    ], y_title='BTC Price (log scale)')
+
+@figure_cache.cached
 def create_transformed_cycle(df):
-    fig = go.Figure()
-
-    # Create a subplot with 2 y-axes
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add 'BTC Price' trace with a logarithmic scale
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['BTC Price'], name='BTC Price (log scale)', line=dict(color='blue')),
-        secondary_y=False,
-    )
-
-    # Add
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['Adjusted Normalized Price'], name='Transformed Cycle Range', mode='lines', line=dict(color='purple')),
-        secondary_y=True,
-    )
-
-    # Set x-axis title
-    fig.update_xaxes(title_text='Date')
-
-    # Set y-axes titles
-    fig.update_yaxes(title_text='BTC Price (log scale)', secondary_y=False, type='log', tickcolor='blue')
-    #fig.update_yaxes(title_text='HODL Waves (BTC)', secondary_y=True, tickcolor='red')
-
-    # Set the title
-    fig.update_layout(height=600,
-                      legend=dict(
-                        orientation='h',  # Horizontal layout
-                        yanchor='bottom', # Anchor legend at the bottom
-                        y=1.02,           # Position legend slightly above the plot
-                        xanchor='center', # Anchor legend in the center
-                        x=0.5             # Center the legend horizontally
-    ))
-
-    return fig
+    return build_figure(df, [
+        line('BTC Price', 'BTC Price (log scale)', 'blue', mode=None),
+        line('Adjusted Normalized Price', 'Transformed Cycle Range', 'purple', secondary_y=True),
+    ], y_title='BTC Price (log scale)')
@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+import time
+
+import sources
+
+LOGGER = logging.getLogger(__name__)
+
+# Reload each source this many seconds before its TTL runs out
+REFRESH_LEAD = float(os.environ.get("ONCHAIN_REFRESH_LEAD", 5 * 60))
+
+
+class Refresher:
+    """Reload sources in the background shortly before their TTL runs out.
+
+    Frames are swapped in by sources once a reload succeeds, so readers keep
+    getting the last good copy while a reload runs or after one fails.
+    """
+
+    def __init__(self, names=None, lead=REFRESH_LEAD, retry=sources.RETRY_AFTER, clock=time.monotonic):
+        self.names = list(sources.SOURCES) if names is None else list(names)
+        self.interval = max(sources.TTL - lead, 0)
+        self.retry = retry
+        self.clock = clock
+
+        # Sources that are already loaded are first due when their copy nears expiry
+        now = clock()
+        self._due = {name: self._next_due(name, now) for name in self.names}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _next_due(self, name, now):
+        # Copies from the store or the registry are loaded already aged, so the
+        # next reload is due by the age of the copy rather than by when it was loaded
+        age = sources.age(name)
+        return now if age is None else now + max(self.interval - age, 0)
+
+    def run_pending(self):
+        """Reload every source that is due and return the seconds until the next one is."""
+        now = self.clock()
+        due = [name for name in self.names if self._due[name] <= now]
+
+        if due:
+            errors = sources.refresh(due)
+            now = self.clock()
+            for name, error in errors.items():
+                if error is None:
+                    self._due[name] = self._next_due(name, now)
+                else:
+                    LOGGER.warning("Refreshing %s failed: %r", name, error)
+                    self._due[name] = now + self.retry
+
+        return max(min(self._due.values()) - self.clock(), 0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.run_pending()
+            except Exception:
+                LOGGER.exception("Refresher pass failed")
+                delay = self.retry
+            self._stop.wait(delay)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="onchain-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start():
+    """Start the process-wide refresher once; every source is prefetched on its first pass."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = Refresher().start()
+        return _refresher
+
+
+def status():
+    """Return the last refresh time, duration, version and error of every source."""
+    return sources.status()
@@ -0,0 +1,118 @@
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Every Streamlit process on the host publishes its frames here and attaches to
+# the others' instead of fetching and parsing the same sources again
+REGISTRY_DIR = os.environ.get(
+    "ONCHAIN_REGISTRY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "registry"),
+)
+
+_lock = threading.Lock()
+_attached = {}  # name -> (version, frame) this process last attached to
+
+
+def _path(name, suffix):
+    return os.path.join(REGISTRY_DIR, f"{name}.{suffix}")
+
+
+@contextlib.contextmanager
+def _publishing(name):
+    # One publisher per name across every process on the host
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    with open(_path(name, "lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write(path, write):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def lookup(name):
+    """Return the latest published version of name and its age in seconds, or None."""
+    try:
+        with open(_path(name, "version")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta["version"], time.time() - meta["published"]
+
+
+def publish(name, df, age=0):
+    """Publish df, loaded age seconds ago, as the next version of name and return that version.
+
+    The values are written as one column-major float block, so attaching
+    processes memory-map it and wrap it as a frame without copying.
+    """
+    with _publishing(name):
+        latest = lookup(name)
+        version = 1 if latest is None else latest[0] + 1
+
+        values = np.asfortranarray(df.to_numpy(dtype=float))
+        _write(_path(name, f"{version}.values.npy"), lambda f: np.save(f, values))
+        _write(_path(name, f"{version}.index.npy"), lambda f: np.save(f, df.index.to_numpy()))
+        meta = {"columns": list(df.columns), "index_name": df.index.name}
+        _write(_path(name, f"{version}.json"), lambda f: f.write(json.dumps(meta).encode()))
+
+        # The version file is replaced last, so readers never see a partial version
+        meta = {"version": version, "published": time.time() - age}
+        _write(_path(name, "version"), lambda f: f.write(json.dumps(meta).encode()))
+
+        # Keep the previous version for readers still opening it; mapped files
+        # stay readable after they are unlinked
+        for suffix in ("values.npy", "index.npy", "json"):
+            with contextlib.suppress(OSError):
+                os.remove(_path(name, f"{version - 2}.{suffix}"))
+
+    return version
+
+
+def _open(name, version):
+    with open(_path(name, f"{version}.json")) as f:
+        meta = json.load(f)
+    values = np.load(_path(name, f"{version}.values.npy"), mmap_mode="r")
+    index = pd.DatetimeIndex(np.load(_path(name, f"{version}.index.npy")), name=meta["index_name"])
+    return pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
+
+
+def attach(name):
+    """Return the latest published frame of name and its version, or None if there is none.
+
+    The frame is a read-only view of the memory-mapped file; a version this
+    process already attached to is returned without reopening it.
+    """
+    for _ in range(3):
+        latest = lookup(name)
+        if latest is None:
+            return None
+        version = latest[0]
+
+        with _lock:
+            attached = _attached.get(name)
+        if attached is not None and attached[0] == version:
+            return attached[1], version
+
+        try:
+            df = _open(name, version)
+        except OSError:
+            # Two newer versions were published while opening this one
+            continue
+
+        with _lock:
+            _attached[name] = (version, df)
+        return df, version
+    return None
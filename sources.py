@@ -0,0 +1,367 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+import store
+from fetch import digest, fetch, stream
+from frames import build_frame
+from plotly_extract import decode_plotly_payload, extract_var_traces, load_plotly_data, load_script, stream_plotly_payload
+
+LOGGER = logging.getLogger(__name__)
+
+# Manifest of every upstream chart page, keyed by the name loaders ask for.
+# 'columns' maps each upstream trace the frame needs to its column name; the
+# arrays of every trace not listed here are skipped without being decoded.
+SOURCES = {
+    "onchain_originals": {
+        "url": "https://charts.checkonchain.com/btconchain/pricing/pricing_onchainoriginals/pricing_onchainoriginals_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "Cointime Price": "Cointime Price",
+            "Delta Price": "Delta Price",
+            "Vaulted Price": "Vaulted Price",
+            "Realized Price": "Realized Price",
+            "Balanced Price": "Balanced Price",
+            "True Mean Price": "True Mean Price",
+        },
+    },
+    "mvrv": {
+        "url": "https://charts.checkonchain.com/btconchain/pricing/pricing_mvrv/pricing_mvrv_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "MVRV Ratio": "MVRV Ratio",
+        },
+    },
+    "aviv_nupl": {
+        "url": "https://charts.checkonchain.com/btconchain/cointime/cointime_pricing_mvrv_nupl/cointime_pricing_mvrv_nupl_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "True Market Mean": "True Market Mean",
+            "AVIV NUPL": "AVIV NUPL",
+        },
+    },
+    "aviv_ratio": {
+        "url": "https://charts.checkonchain.com/btconchain/pricing/cointime_mvrv_aviv_1/cointime_mvrv_aviv_1_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "True Market Mean": "True Market Mean",
+            "AVIV Ratio": "AVIV Ratio",
+        },
+    },
+    "sth_nupl": {
+        "url": "https://charts.checkonchain.com/btconchain/pricing/pricing_nupl_lthsth_est/pricing_nupl_lthsth_est_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "NUPL": "NUPL",
+            "STH-NUPL": "Young-NUPL",
+            "LTH-NUPL": "Old-NUPL",
+            "Euphoria (2-of-3)": "Euphoria (2-of-3)",
+            "Euphoria (3-of-3)": "Euphoria (3-of-3)",
+            "Max Pain": "Max Pain",
+        },
+    },
+    "sth_mvrv": {
+        "url": "https://charts.checkonchain.com/btconchain/pricing/pricing_sthmvrvindicator/pricing_sthmvrvindicator_light.html",
+        "columns": {
+            "Price": "BTC Price",
+            "STH Cost Basis": "STH Cost Basis",
+            "STH-MVRV (in Profit)": "STH-MVRV (in Profit)",
+            "STH-MVRV (in Loss)": "STH-MVRV (in Loss)",
+        },
+    },
+    "realized_price_ribbon": {
+        "url": "https://chainexposed.com/RealizedPriceRibbonIsolated.html",
+        "format": "var_trace",
+        "columns": {
+            "Price": "Price",
+            "1m to 3m": "1m to 3m",
+        },
+    },
+}
+
+# Set to 1 to load sequentially, e.g. to compare startup wall-clock time
+MAX_WORKERS = int(os.environ.get("ONCHAIN_LOADER_WORKERS", 4))
+
+# Seconds a loaded source is served before the next access reloads it
+TTL = float(os.environ.get("ONCHAIN_TTL", 60 * 60))
+
+
+def _payload_digest(texts):
+    payload_hash = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        payload_hash.update(text.encode("utf-8"))
+    return payload_hash.hexdigest()
+
+
+# Each builder returns the frame and the digests of the page body and of the
+# payload it was parsed from. The frame is None when either digest matches
+# previous, the digests of the copy already loaded, so nothing was parsed.
+
+def _plotly_frame(url, columns, previous):
+    names = set(columns)
+
+    def parse(chunks):
+        # Decode the traces while the page downloads, without holding the whole page
+        payload = stream_plotly_payload(chunks, names)
+        payload_digest = _payload_digest(payload)
+        if payload_digest == previous.get("payload"):
+            return None, payload_digest
+        return build_frame(decode_plotly_payload(payload, names), columns), payload_digest
+
+    try:
+        parsed = stream(url, parse, unless_digest=previous.get("body"))
+    except ValueError:
+        # Not the layout the scanner expects: parse the whole page, with its DOM fallback
+        return build_frame(load_plotly_data(fetch(url), names=names), columns), {"body": digest(url), "payload": None}
+    if parsed is None:
+        return None, previous
+    df, payload_digest = parsed
+    return df, {"body": digest(url), "payload": payload_digest}
+
+
+def _var_trace_frame(url, columns, previous):
+    html = stream(url, "".join, unless_digest=previous.get("body"))
+    if html is None:
+        return None, previous
+    script_content = load_script(html, 'var trace')
+    digests = {"body": digest(url), "payload": _payload_digest([script_content])}
+    if digests["payload"] == previous.get("payload"):
+        return None, digests
+    return build_frame(extract_var_traces(script_content, names=set(columns)), columns), digests
+
+
+_BUILDERS = {
+    "plotly": _plotly_frame,
+    "var_trace": _var_trace_frame,
+}
+
+# Seconds to keep serving the last good copy after a failed reload before retrying
+RETRY_AFTER = float(os.environ.get("ONCHAIN_RETRY_AFTER", 60))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="onchain-loader")
+_lock = threading.Lock()
+_futures = {}     # name -> Future of the latest load
+_current = {}     # name -> (frame, version) of the last successful load
+_changes = {}     # name -> index of the rows the last successful load added
+_loaded_at = {}   # name -> time.monotonic() of the last successful load
+_status = {}      # name -> last refresh time, duration, version and error
+_registry_versions = {}  # name -> registry version of the copy in _current
+_digests = {}     # name -> digests of the page body and payload behind the copy in _current
+_skips = {}       # name -> reloads that skipped parsing because the body or payload was unchanged
+_startup = {}
+
+
+def _newer_published(name):
+    # A copy published by another process within the TTL that this one has not loaded yet
+    latest = registry.lookup(name)
+    if latest is None:
+        return None
+    version, age = latest
+    with _lock:
+        if age > TTL or _registry_versions.get(name) == version:
+            return None
+    attached = registry.attach(name)
+    if attached is None:
+        return None
+    df, version = attached
+    return df, version, age
+
+
+def _load(name):
+    started = time.perf_counter()
+    source = SOURCES[name]
+    try:
+        skipped = None
+        digests = {}
+        published = _newer_published(name)
+        if published is not None:
+            # Another process on the host loaded a copy we have not seen: attach to it
+            df, registry_version, stored_age = published
+            changed = df.index
+            if name in _current:
+                changed = df.index[df.index > _current[name][0].index.max()]
+        else:
+            # On a cold start reuse the stored frame while it is younger than the TTL
+            stored_age = None if name in _current else store.age(name)
+            df = store.read(name) if stored_age is not None and stored_age <= TTL else None
+
+            if df is not None:
+                changed = df.index
+            else:
+                stored_age = 0
+                with _lock:
+                    previous = _digests.get(name, {}) if name in _current else {}
+                df, digests = _BUILDERS[source.get("format", "plotly")](source["url"], source["columns"], previous)
+                if df is None:
+                    # Same body or payload as the copy we hold: keep it without parsing anything
+                    skipped = "body" if digests["body"] == previous.get("body") else "payload"
+                    df = _current[name][0]
+                    changed = df.index[:0]
+                else:
+                    df, changed = store.append(name, df)
+                    if name not in _current:
+                        # Nothing downstream has seen this source yet, so every row is new to it
+                        changed = df.index
+
+            if skipped:
+                registry_version = _registry_versions.get(name)
+            else:
+                registry_version = registry.publish(name, df, age=stored_age)
+    except Exception as e:
+        with _lock:
+            _status.setdefault(name, {})["error"] = repr(e)
+        raise
+    elapsed = time.perf_counter() - started
+
+    # Swap the new frame in as one step; readers see either the old or the new copy
+    with _lock:
+        if name in _current and len(changed) == 0:
+            # Nothing new upstream: keep the version so derived frames are reused
+            df, version = _current[name]
+        else:
+            version = _current[name][1] + 1 if name in _current else 1
+        _current[name] = (df, version)
+        _registry_versions[name] = registry_version
+        _digests[name] = digests
+        if skipped:
+            _skips.setdefault(name, {"body": 0, "payload": 0})[skipped] += 1
+        _changes[name] = changed
+        _loaded_at[name] = time.monotonic() - stored_age
+        _status[name] = {
+            "last_refresh": time.time(),
+            "duration": elapsed,
+            "version": version,
+            "rows_added": len(changed),
+            "error": None,
+        }
+    LOGGER.info("Loaded %s in %.2fs (%d new rows)", name, elapsed, len(changed))
+
+    return df, version
+
+
+def _fresh(name):
+    return name in _current and time.monotonic() - _loaded_at[name] <= TTL
+
+
+def _report_startup(_future):
+    # Log the wall-clock time once every source started by prefetch() is in
+    with _lock:
+        if _startup.get("finished") or not all(f.done() for f in _futures.values()):
+            return
+        _startup["finished"] = time.perf_counter()
+        elapsed = _startup["finished"] - _startup["started"]
+    LOGGER.info("Loaded %d sources in %.2fs with %d worker(s)", len(_futures), elapsed, MAX_WORKERS)
+
+
+def _submit(names, force):
+    # Start a load for every name that needs one, reusing loads already in flight
+    with _lock:
+        _startup.setdefault("started", time.perf_counter())
+        submitted = []
+        futures = {}
+        for name in names:
+            future = _futures.get(name)
+            if (future is None or future.done()) and (force or not _fresh(name)):
+                future = _futures[name] = _executor.submit(_load, name)
+                submitted.append(future)
+            futures[name] = future
+
+    for future in submitted:
+        future.add_done_callback(_report_startup)
+
+    return futures
+
+
+def prefetch(names=None):
+    """Start loading names (default: every source) in the background."""
+    _submit(list(SOURCES) if names is None else names, force=False)
+
+
+def refresh(names=None):
+    """Reload names (default: every source) now and wait; return {name: error or None}."""
+    futures = _submit(list(SOURCES) if names is None else names, force=True)
+
+    errors = {}
+    for name, future in futures.items():
+        try:
+            future.result()
+            errors[name] = None
+        except Exception as e:
+            errors[name] = e
+    return errors
+
+
+def load_versioned(name):
+    """Return the combined frame for name and its version, waiting only on that source."""
+    future = _submit([name], force=False)[name]
+
+    with _lock:
+        if _fresh(name):
+            return _current[name]
+
+    try:
+        return future.result()
+    except Exception:
+        with _lock:
+            if name not in _current:
+                raise
+            # Serve the last good copy for another RETRY_AFTER seconds before trying again
+            LOGGER.warning("Reloading %s failed, serving the last good copy", name, exc_info=True)
+            _loaded_at[name] = time.monotonic() - TTL + RETRY_AFTER
+            return _current[name]
+
+
+def load(name):
+    """Return the combined frame for name, waiting only on that source."""
+    return load_versioned(name)[0]
+
+
+def changes(name):
+    """Return the index of the rows added to name by its latest load.
+
+    After a cold start this is every row; after a refresh only the days that
+    were not in the local store yet.
+    """
+    with _lock:
+        return _changes.get(name)
+
+
+def age(name):
+    """Return the seconds since name was last loaded, or None if it never was."""
+    with _lock:
+        if name not in _loaded_at:
+            return None
+        return time.monotonic() - _loaded_at[name]
+
+
+def timings():
+    """Return the load time in seconds of every source loaded so far."""
+    with _lock:
+        return {name: status["duration"] for name, status in _status.items() if "duration" in status}
+
+
+def status():
+    """Return the last refresh time, duration, version and error of every source."""
+    with _lock:
+        return {name: dict(status) for name, status in _status.items()}
+
+
+def digests():
+    """Return the body and payload digests of every source and how many reloads each let skip parsing."""
+    with _lock:
+        return {
+            name: {**source_digests, "skips": dict(_skips.get(name, {"body": 0, "payload": 0}))}
+            for name, source_digests in _digests.items()
+        }
+
+
+def startup_time():
+    """Return the wall-clock seconds prefetch() took to load every source, or None."""
+    with _lock:
+        if "finished" not in _startup:
+            return None
+        return _startup["finished"] - _startup["started"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import figure_cache
+import moments
+from figure_spec import build_figure, line
+import metrics
+
+
+@metrics.metric("sth_mvrv")
+def sth_mvrv_combined(combined_df):
+    return pd.Series(np.where(
+        combined_df['STH-MVRV (in Profit)'] == 1,
+        combined_df['STH-MVRV (in Loss)'],
+        np.where(
+            combined_df['STH-MVRV (in Loss)'] == 1,
+            combined_df['STH-MVRV (in Profit)'],
+            np.nan  # or some other default value if neither condition is met
+        )
+    ), index=combined_df.index)
+
+
+@metrics.metric("sth_mvrv_combined")
+def sth_mvrv_bands(sth_mvrv_combined):
+    # Expanding mean and standard deviation bands from 2012, updated from the last day seen
+    sth_mvrv_combined = sth_mvrv_combined[sth_mvrv_combined.index.year >= 2012]
+    return moments.expanding_bands(sth_mvrv_combined, [2, 2.5, -1.25], name='sth_mvrv.STH-MVRV')
+
+
+@metrics.metric("sth_mvrv", "sth_mvrv_combined", "sth_mvrv_bands")
+def get_dataframe_sth_mvrv(combined_df, sth_mvrv_combined, sth_mvrv_bands):
+    combined_df = combined_df.copy()
+    combined_df['STH-MVRV Combined'] = sth_mvrv_combined
+
+    return combined_df.join(sth_mvrv_bands)
+
+
+# Function to create the plot using Plotly
+@figure_cache.cached
+def create_chart_sth_mvrv(combined_df):
+    # Filter the DataFrame to only include data from 2012 onwards
+    # The bands are computed from 2012 by sth_mvrv_bands but only drawn from 2015
+    combined_df_filtered = combined_df[combined_df.index.year >= 2015]
+
+    return build_figure(combined_df_filtered, [
+        line('BTC Price', 'BTC Price', 'black'),
+        line('STH Cost Basis', 'STH Cost Basis', 'blue'),
+        line('STH-MVRV Combined', 'STH MVRV', 'purple', secondary_y=True),
+        line('Mean + 2σ', 'Mean + 2σ', 'orange', secondary_y=True),
+        line('Mean + 2.5σ', 'Mean + 2.5σ', 'red', secondary_y=True),
+        line('Mean - 1.25σ', 'Mean - 1.25σ', 'green', secondary_y=True),
+    ], y_title='BTC Price (log scale)', y2_title='STH Cost Basis & MVRV', hlines=[(1, 'gray')])
@@ -0,0 +1,31 @@
+import figure_cache
+import moments
+from figure_spec import build_figure, line
+import metrics
+
+
+@metrics.metric("sth_nupl")
+def sth_nupl_bands(combined_df):
+    # Expanding mean and standard deviation bands from 2012, updated from the last day seen
+    young_nupl = combined_df.loc[combined_df.index.year >= 2012, 'Young-NUPL']
+    return moments.expanding_bands(young_nupl, [2, 1.5], name='sth_nupl.Young-NUPL')
+
+
+@metrics.metric("sth_nupl", "sth_nupl_bands")
+def get_dataframe_nupl(combined_df, sth_nupl_bands):
+    return combined_df.join(sth_nupl_bands)
+
+
+# Function to create the plot using Plotly
+@figure_cache.cached
+def create_chart_nupl(combined_df):
+    # Filter the DataFrame to only include data from 2012 onwards
+    combined_df_filtered = combined_df[combined_df.index.year >= 2012]
+
+    # 'BTC Price' on a logarithmic scale, STH NUPL and its bands on the second y-axis
+    return build_figure(combined_df_filtered, [
+        line('BTC Price', 'BTC Price', 'blue'),
+        line('Young-NUPL', 'STH NUPL', 'purple', secondary_y=True),
+        line('Mean + 2σ', 'Mean + 2σ', 'red', secondary_y=True),
+        line('Mean + 1.5σ', 'Mean + 1.5σ', 'orange', secondary_y=True),
+    ], y_title='BTC Price (log scale)', y2_title='STH-NUPL (linear scale)', hlines=[(0, 'green')])
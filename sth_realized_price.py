@@ -0,0 +1,25 @@
+import pandas as pd
+import figure_cache
+from figure_spec import build_figure, line
+import metrics
+
+
+@metrics.metric("realized_price_ribbon")
+def sth_mvrv_df(final_df):
+    final_df = final_df.copy()
+    final_df['STH Cost Basis'] = final_df['1m to 3m'].astype(float)
+    final_df['STH MVRV'] = final_df['Price'].astype(float) / final_df['1m to 3m'].astype(float)
+
+    return final_df
+
+
+@figure_cache.cached
+def create_sth_pnl_plot(df):
+    df = df[df.index >= pd.to_datetime('2012')]
+
+    # 'STH Cost Basis' on the price axis and 'STH MVRV' on the second y-axis
+    return build_figure(df, [
+        line('Price', 'BTC Price (log scale)', 'black', mode=None),
+        line('STH Cost Basis', 'STH Realized Price', 'brown'),
+        line('STH MVRV', 'STH PnL', 'purple', secondary_y=True),
+    ], y_title='BTC Price & STH Realized Price', y2_title='STH PnL', hlines=[(1, 'black')])
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Each source's combined frame is kept as one Feather file so a restart can
+# reload the full history in milliseconds instead of re-parsing the page
+STORE_DIR = os.environ.get(
+    "ONCHAIN_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "store"),
+)
+
+_lock = threading.Lock()
+
+
+def _path(name):
+    return os.path.join(STORE_DIR, name + ".feather")
+
+
+def age(name):
+    """Return the seconds since the stored frame for name was written, or None."""
+    try:
+        return time.time() - os.path.getmtime(_path(name))
+    except OSError:
+        return None
+
+
+def read(name):
+    """Return the stored frame for name, or None if there is none."""
+    try:
+        df = pd.read_feather(_path(name))
+    except (OSError, ValueError):
+        return None
+    return df.set_index('Date')
+
+
+def write(name, df):
+    """Replace the stored frame for name."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _path(name)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.rename_axis('Date').reset_index().to_feather(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def append(name, df):
+    """Store the rows of df newer than the stored max date.
+
+    Returns the stored frame after the append and the index of the rows that
+    were added, so downstream code only has to recompute those.
+    """
+    with _lock:
+        stored = read(name)
+
+        # Nothing usable on disk yet (or the columns changed): store everything
+        if stored is None or list(stored.columns) != list(df.columns):
+            write(name, df)
+            return df, df.index
+
+        new_rows = df[df.index > stored.index.max()]
+        if new_rows.empty:
+            return stored, new_rows.index
+
+        combined = pd.concat([stored, new_rows])
+        write(name, combined)
+        return combined, new_rows.index
@@ -0,0 +1,88 @@
+"""Synthetic chart pages in the layouts of the upstream hosts.
+
+checkonchain pages are Plotly's own to_html output; chainexposed pages
+declare each trace as a `var traceN = {...};` object in an inline script.
+The values are random walks, so the pages are only realistic in shape.
+
+Run as a script to rewrite the fixtures in tests/fixtures.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Traces of the mvrv and realized_price_ribbon sources, plus ones no source reads
+PLOTLY_TRACES = ["Price", "MVRV Ratio", "Extra A", "Extra B"]
+VAR_TRACES = ["Price", "1m to 3m", "3m to 6m", "6m to 12m"]
+
+
+def _dates(days, end):
+    return pd.date_range(end=end, periods=days, freq="D").strftime("%Y-%m-%d").tolist()
+
+
+def _walks(names, days, seed):
+    # Every trace but the price starts with a month of gaps, like the ratio charts.
+    # Each trace draws from its own stream, so a longer page extends a shorter one
+    walks = {}
+    for i, name in enumerate(names):
+        rng = np.random.default_rng([seed, i])
+        values = np.round(100 * np.exp(np.cumsum(rng.normal(0.001, 0.03, days))), 4).tolist()
+        if i:
+            values[:30] = [None] * 30
+        walks[name] = values
+    return walks
+
+
+def plotly_page(days=400, end="2024-06-30", names=PLOTLY_TRACES, seed=0, comment=None):
+    """Return a checkonchain page; comment is put in the head without touching the data."""
+    dates = _dates(days, end)
+    fig = go.Figure()
+    for name, values in _walks(names, days, seed).items():
+        fig.add_trace(go.Scatter(x=dates, y=values, name=name, mode="lines", hovertemplate="%{y}<br>"))
+    html = fig.to_html(include_plotlyjs="cdn", full_html=True, div_id="chart")
+    if comment is not None:
+        html = html.replace("<head>", f"<head><!-- {comment} -->", 1)
+    return html
+
+
+def var_trace_page(days=400, end="2024-06-30", names=VAR_TRACES, seed=0):
+    """Return a chainexposed page."""
+    dates = _dates(days, end)
+    traces = [
+        f"var trace{i} = {{\n  x: {json.dumps(dates)},\n  y: {json.dumps(values)},\n"
+        f"  name: '{name}',\n  type: 'scatter'\n}};"
+        for i, (name, values) in enumerate(_walks(names, days, seed).items())
+    ]
+    data = ", ".join(f"trace{i}" for i in range(len(traces)))
+    return (
+        "<html><head><script src='https://cdn.plot.ly/plotly-2.12.1.min.js'></script></head>"
+        "<body><div id='chart'></div><script>\n" + "\n".join(traces)
+        + f"\nvar data = [{data}];\nPlotly.newPlot('chart', data);\n</script></body></html>"
+    )
+
+
+# The fixtures the tests serve: a page, the same page with only a comment
+# changed, the page a day later, and a chainexposed page
+FIXTURE_PAGES = {
+    "checkonchain.html": lambda: plotly_page(),
+    "checkonchain_comment.html": lambda: plotly_page(comment="rendered 2024-07-01"),
+    "checkonchain_next_day.html": lambda: plotly_page(days=401, end="2024-07-01"),
+    "chainexposed.html": lambda: var_trace_page(),
+}
+
+
+def fixture(name):
+    """Return the text of a fixture page in tests/fixtures."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURES, exist_ok=True)
+    for name, page in FIXTURE_PAGES.items():
+        with open(os.path.join(FIXTURES, name), "w", encoding="utf-8") as f:
+            f.write(page())
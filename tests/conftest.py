@@ -0,0 +1,128 @@
+import contextlib
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live at the repository root and read their directories from the
+# environment when imported, so point them at a scratch directory first
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The code the optimised paths replaced, which the tests check them against
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+_scratch = tempfile.mkdtemp(prefix="onchain-tests-")
+os.environ.setdefault("ONCHAIN_CACHE_DIR", os.path.join(_scratch, "http"))
+os.environ.setdefault("ONCHAIN_STORE_DIR", os.path.join(_scratch, "store"))
+os.environ.setdefault("ONCHAIN_REGISTRY_DIR", os.path.join(_scratch, "registry"))
+
+
+class Upstream:
+    """A local stand-in for the chart hosts.
+
+    routes maps a path to the responses it gives in turn, the last one
+    repeating; each is a dict with status, body, headers and a delay in
+    seconds before answering, or a callable taking the request headers and
+    returning one.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []  # (path, request headers) in arrival order
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._connections = []
+        self._lock = threading.Lock()
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with upstream._lock:
+                    upstream._connections.append(self.connection)
+
+            def do_GET(self):
+                upstream._answer(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._server.server_port}{path}"
+
+    def hits(self, path):
+        return sum(1 for seen, _ in self.requests if seen == path)
+
+    def _answer(self, handler):
+        with self._lock:
+            self.requests.append((handler.path, dict(handler.headers)))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            responses = self.routes.get(handler.path) or [{"status": 404}]
+            response = responses.pop(0) if len(responses) > 1 else responses[0]
+        try:
+            if callable(response):
+                response = response(handler.headers)
+            time.sleep(response.get("delay", 0))
+            body = response.get("body", b"")
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            handler.send_response(response.get("status", 200))
+            for key, value in response.get("headers", {}).items():
+                handler.send_header(key, value)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, as the timeout tests expect
+            pass
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self):
+        # Kept-alive connections are dropped too, so the host is unreachable from here on
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for connection in self._connections:
+                with contextlib.suppress(OSError):
+                    connection.shutdown(socket.SHUT_RDWR)
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fresh_sources(monkeypatch, tmp_path):
+    """Give sources an empty manifest, empty state and its own cache directories."""
+    import fetch
+    import registry
+    import sources
+    import store
+
+    monkeypatch.setattr(fetch, "CACHE_DIR", str(tmp_path / "http"))
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(registry, "REGISTRY_DIR", str(tmp_path / "registry"))
+    monkeypatch.setattr(registry, "_attached", {})
+    monkeypatch.setattr(sources, "SOURCES", {})
+    for state in ["_futures", "_current", "_changes", "_loaded_at", "_status",
+                  "_registry_versions", "_digests", "_skips", "_startup"]:
+        monkeypatch.setattr(sources, state, {})
+    return sources
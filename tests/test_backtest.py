@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+
+# Seven days worked by hand. Positions (1 = long at that day's close):
+#   signal          0.5  0.2  nan  0.9  0.4  0.1  0.95
+#   buy .3 sell .8   0    1    1    0    0    1    0    earns 99/110, 99/99, 120/108 = 1.0
+#   buy .6 sell .6   1    1    1    0    1    1    0    earns 1.1 * 0.9 * 1 * 0.9 * 10/9 = 0.99,
+#                                                        lowest at 0.891 after a peak of 1.1
+#   buy 0  sell 1    0    0    0    0    0    0    0
+PRICE = [100.0, 110.0, 99.0, 99.0, 120.0, 108.0, 120.0]
+SIGNAL = [0.5, 0.2, np.nan, 0.9, 0.4, 0.1, 0.95]
+
+
+def test_simulate_hand_worked_week():
+    result = backtest.simulate(np.array(PRICE), np.array(SIGNAL), buy=[0.3, 0.6, 0.0], sell=[0.8, 0.6, 1.0])
+    np.testing.assert_allclose(result["total_return"], [0.0, -0.01, 0.0], atol=1e-12)
+    np.testing.assert_allclose(result["max_drawdown"], [-0.1, 0.891 / 1.1 - 1, 0.0], atol=1e-12)
+    np.testing.assert_array_equal(result["trades"], [2, 2, 0])
+    np.testing.assert_allclose(result["exposure"], [3 / 7, 5 / 7, 0.0])
+    np.testing.assert_array_equal(result["buy"], [0.3, 0.6, 0.0])
+    np.testing.assert_array_equal(result["sell"], [0.8, 0.6, 1.0])
+
+
+def test_sweep_matches_simulate():
+    frame = pd.DataFrame({"BTC Price": PRICE, "Signal": SIGNAL},
+                         index=pd.date_range("2024-01-01", periods=7, freq="D"))
+    results = backtest.run(frame, {"Signal": ([0.3, 0.6], [0.6, 0.8])}, workers=2, chunk_size=1)
+
+    # Every pair with buy <= sell, best total return first
+    assert sorted(zip(results["buy"], results["sell"])) == [(0.3, 0.6), (0.3, 0.8), (0.6, 0.6), (0.6, 0.8)]
+    assert list(results["total_return"]) == sorted(results["total_return"], reverse=True)
+    assert set(results["signal"]) == {"Signal"}
+    for row in results.itertuples():
+        expected = backtest.simulate(np.array(PRICE), np.array(SIGNAL), [row.buy], [row.sell])
+        assert row.total_return == pytest.approx(expected["total_return"][0])
+        assert row.trades == expected["trades"][0]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import band_models
+import norm_mvrv
+import price_models
+
+
+@pytest.fixture
+def mvrv_df():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2010-07-18", periods=5000, freq="D", name="Date")
+    return pd.DataFrame({
+        "BTC Price": np.exp(np.cumsum(rng.normal(0.001, 0.03, len(index)))),
+        "MVRV Ratio": np.exp(rng.normal(0.3, 0.4, len(index))),
+    }, index=index)
+
+
+@pytest.fixture
+def combined_df():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("2012-01-01", periods=4600, freq="D", name="Date")
+    values = np.exp(np.cumsum(rng.normal(0.001, 0.03, (len(index), len(price_models.PRICE_COLUMNS))), axis=0))
+    return pd.DataFrame(values, index=index, columns=price_models.PRICE_COLUMNS)
+
+
+def test_mvrv_model_reproduces_adjusted_mvrv(mvrv_df):
+    expected = norm_mvrv.adjusted_mvrv.__wrapped__(mvrv_df)['Adjusted_MVRV'].to_numpy()
+    log_mvrv = np.log2(mvrv_df['MVRV Ratio'])
+    np.testing.assert_allclose(band_models.evaluate(log_mvrv, band_models.MVRV_MODEL)[0], expected, rtol=1e-12)
+
+    # The model's rows count from 1; counting from 0 gives another series
+    assert not np.allclose(band_models.evaluate(log_mvrv, band_models.MVRV_MODEL, start_row=0)[0], expected,
+                           rtol=1e-12, equal_nan=True)
+
+
+def test_cycle_model_reproduces_adjusted_normalized_price(combined_df):
+    cycles = price_models.cycle_frame(combined_df)
+    adjusted = band_models.evaluate(cycles['Normalized Price'], band_models.CYCLE_MODEL)[0]
+    np.testing.assert_allclose(adjusted, cycles['Adjusted Normalized Price'].to_numpy(), rtol=1e-12)
+
+
+def test_grid_keeps_the_row_origin(mvrv_df):
+    log_mvrv = np.log2(mvrv_df['MVRV Ratio'])
+    params = band_models.grid(band_models.MVRV_MODEL, top_shift=[10.5, 10.75])
+    assert params['start_row'] == 1
+    np.testing.assert_array_equal(band_models.evaluate(log_mvrv, params)[1],
+                                  band_models.evaluate(log_mvrv, band_models.MVRV_MODEL)[0])
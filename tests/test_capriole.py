@@ -0,0 +1,144 @@
+import io
+import time
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import capriole
+
+TTL = 3600
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSheets:
+    """A GSheetsConnection over in-memory worksheets.
+
+    Each read parses the worksheet as CSV with the options given, as the
+    public-sheet client does with the CSV it downloads, and is recorded.
+    """
+
+    def __init__(self, worksheets):
+        self.worksheets = worksheets
+        self.reads = []  # (worksheet, skiprows) of every read
+
+    def read(self, spreadsheet, worksheet, ttl=None, **options):
+        assert spreadsheet == capriole.SPREADSHEET and ttl == 0
+        self.reads.append((worksheet, options.get("skiprows")))
+        return pd.read_csv(io.StringIO(self.worksheets[worksheet].to_csv(index=False)), **options)
+
+
+def worksheets(days):
+    # The first days rows of every sheet, so a longer sheet extends a shorter one
+    rows = 1000
+    dates = pd.date_range("2020-01-01", periods=rows, freq="D").strftime("%Y-%m-%d")
+    rng = np.random.default_rng(0)
+    sheets = {
+        "speculation_index": pd.DataFrame({
+            "date": dates,
+            "unused": rng.normal(size=rows).round(4),
+            "Speculation Index": rng.uniform(0, 100, rows).round(4),
+        }),
+        "breadth_crypto": pd.DataFrame({
+            "date": dates,
+            "breadth50": rng.uniform(size=rows).round(4),
+            "breadth200": rng.uniform(size=rows).round(4),
+        }),
+    }
+    return {worksheet: df.iloc[:days] for worksheet, df in sheets.items()}
+
+
+def full_read(sheets):
+    # What reading every worksheet from scratch returns
+    return {
+        worksheet: capriole._parse(pd.read_csv(io.StringIO(df.to_csv(index=False)), **capriole.WORKSHEETS[worksheet]))
+        for worksheet, df in sheets.worksheets.items()
+    }
+
+
+def assert_frames_equal(frames, expected):
+    assert frames.keys() == expected.keys()
+    for worksheet in expected:
+        pd.testing.assert_frame_equal(frames[worksheet], expected[worksheet], check_freq=False)
+
+
+def restart(monkeypatch):
+    # A new process: nothing in memory, only the store
+    monkeypatch.setattr(capriole, "_frames", {})
+    monkeypatch.setattr(capriole, "_loaded_at", {})
+
+
+@pytest.fixture
+def clock(fresh_sources, monkeypatch):
+    restart(monkeypatch)
+    clock = Clock()
+    monkeypatch.setattr(capriole, "time", types.SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter))
+    monkeypatch.setattr(capriole, "TTL", TTL)
+    return clock
+
+
+@pytest.fixture
+def sheets(clock):
+    return FakeSheets(worksheets(300))
+
+
+def test_cold_read_then_reuse_within_the_ttl(sheets, clock):
+    frames = capriole.load(sheets)
+    assert sheets.reads == [("speculation_index", None), ("breadth_crypto", None)]
+    assert_frames_equal(frames, full_read(sheets))
+    assert list(frames["speculation_index"].columns) == ["Speculation Index"]
+
+    clock.now += TTL
+    assert_frames_equal(capriole.load(sheets), frames)
+    assert len(sheets.reads) == 2
+
+
+def test_restart_serves_the_stored_copy(sheets, monkeypatch):
+    frames = capriole.load(sheets)
+    restart(monkeypatch)
+    assert_frames_equal(capriole.load(sheets), frames)
+    assert len(sheets.reads) == 2
+
+
+def test_appended_rows_are_read_alone(sheets, clock, monkeypatch):
+    capriole.load(sheets)
+
+    # Once the TTL runs out, only the last stored row and the two appended ones are parsed
+    clock.now += TTL + 1
+    sheets.worksheets = worksheets(302)
+    sheets.reads.clear()
+    frames = capriole.load(sheets)
+    assert sheets.reads == [("speculation_index", range(1, 300)), ("breadth_crypto", range(1, 300))]
+    assert_frames_equal(frames, full_read(sheets))
+
+    # The appended rows are stored for the next restart
+    restart(monkeypatch)
+    assert_frames_equal(capriole.load(sheets), frames)
+    assert len(sheets.reads) == 2
+
+
+def test_inserted_row_falls_back_to_a_full_read(sheets, clock):
+    capriole.load(sheets)
+
+    # A row inserted above the last stored one shifts the rows the skip lands on
+    clock.now += TTL + 1
+    sheets.worksheets = {
+        worksheet: pd.concat([df.iloc[:10], df.iloc[10:11].assign(date="2019-12-31"), df.iloc[10:]])
+        for worksheet, df in sheets.worksheets.items()
+    }
+    sheets.reads.clear()
+    frames = capriole.load(sheets)
+    assert sheets.reads == [
+        ("speculation_index", range(1, 300)), ("speculation_index", None),
+        ("breadth_crypto", range(1, 300)), ("breadth_crypto", None),
+    ]
+    assert_frames_equal(frames, full_read(sheets))
+    assert all(len(df) == 301 for df in frames.values())
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import pytest
+
+from downsample import downsample_figure
+
+
+def _figure(periods, gaps=()):
+    x = pd.date_range("2012-01-01", periods=periods, freq="D").to_numpy()
+    y = np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.02, periods)))
+    for start, end in gaps:
+        y[start:end] = np.nan
+    return go.Figure(go.Scatter(x=x, y=y), layout={"template": None}), x
+
+
+@pytest.mark.parametrize("bound", [pd.Timestamp("2014-01-01"), np.datetime64("2014-01-01", "D"), "2014-01-01"])
+def test_range_bounds_in_any_unit(bound):
+    fig, x = _figure(2000)
+    assert x.dtype != np.dtype("datetime64[s]")
+    downsample_figure(fig, n_out=1500, x_range=(bound, pd.Timestamp("2014-12-31")))
+    trace = fig.data[0]
+    assert len(trace.x) == 365
+    assert pd.Timestamp(trace.x[0]) == pd.Timestamp("2014-01-01")
+    assert pd.Timestamp(trace.x[-1]) == pd.Timestamp("2014-12-31")
+
+
+def test_gaps_kept_when_nothing_is_dropped():
+    fig, _ = _figure(500, gaps=[(100, 130)])
+    downsample_figure(fig, n_out=1500)
+    y = np.asarray(fig.data[0].y)
+    assert len(y) == 500
+    assert np.isnan(y[100:130]).all()
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_gaps_kept_when_downsampling(method):
+    fig, x = _figure(5000, gaps=[(1000, 1200), (3000, 3001)])
+    downsample_figure(fig, n_out=500, method=method)
+    trace = fig.data[0]
+    y = np.asarray(trace.y)
+    assert len(trace.x) == len(y) <= 500
+    assert np.isnan(y).sum() == 2
+    assert list(np.asarray(trace.x)[np.isnan(y)]) == [x[1000], x[3000]]
+    assert np.all(np.diff(np.asarray(trace.x)) > np.timedelta64(0))
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import fetch
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch, tmp_path):
+    monkeypatch.setattr(fetch, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(fetch, "RETRIES", 3)
+    monkeypatch.setattr(fetch, "BACKOFF", 0.01)
+
+
+def test_retries_unavailable(upstream):
+    upstream.routes["/page"] = [{"status": 503}, {"status": 503}, {"body": "<html>chart</html>"}]
+    retries = fetch.cache_stats()["retries"]
+    assert fetch.fetch(upstream.url("/page")) == "<html>chart</html>"
+    assert upstream.hits("/page") == 3
+    assert fetch.cache_stats()["retries"] == retries + 2
+
+
+def test_gives_up_after_retries(upstream):
+    upstream.routes["/page"] = [{"status": 503}]
+    with pytest.raises(requests.HTTPError):
+        fetch.fetch(upstream.url("/page"))
+    assert upstream.hits("/page") == fetch.RETRIES + 1
+
+
+def test_retries_read_timeout(upstream):
+    upstream.routes["/page"] = [{"body": "late", "delay": 1}, {"body": "on time"}]
+    assert fetch.fetch(upstream.url("/page"), timeout=0.2) == "on time"
+    assert upstream.hits("/page") == 2
+
+
+def test_requests_per_host_are_capped(upstream, monkeypatch):
+    monkeypatch.setattr(fetch, "MAX_PER_HOST", 2)
+    paths = [f"/page{i}" for i in range(8)]
+    for path in paths:
+        upstream.routes[path] = [{"body": path, "delay": 0.1}]
+
+    with ThreadPoolExecutor(len(paths)) as executor:
+        bodies = list(executor.map(fetch.fetch, [upstream.url(path) for path in paths]))
+
+    assert bodies == paths
+    assert upstream.peak_in_flight == 2
+
+
+def test_unreachable_host_serves_the_stale_copy(upstream):
+    upstream.routes["/page"] = [{"body": "<html>chart</html>"}]
+    url = upstream.url("/page")
+    assert fetch.fetch(url) == "<html>chart</html>"
+
+    upstream.close()
+    stale = fetch.cache_stats()["stale"]
+    assert fetch.fetch(url) == "<html>chart</html>"
+    assert fetch.cache_stats()["stale"] == stale + 1
+
+
+def test_unreachable_host_without_a_copy_raises(upstream):
+    url = upstream.url("/page")
+    upstream.close()
+    with pytest.raises(requests.ConnectionError):
+        fetch.fetch(url)
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import pytest
+
+import figure_cache
+import utils
+from figure_spec import build_figure, line
+
+COLUMNS = [f"Series {i}" for i in range(9)]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2012-01-01", periods=4500, freq="D", name="Date")
+    values = np.exp(np.cumsum(rng.normal(0, 0.02, (len(index), len(COLUMNS))), axis=0))
+    values[100:130, 3] = np.nan
+    return pd.DataFrame(values, index=index, columns=COLUMNS)
+
+
+@figure_cache.cached
+def spec_chart(df):
+    return build_figure(df, [line(column, column, "blue") for column in COLUMNS], y_title="Value")
+
+
+@figure_cache.cached
+def validated_chart(df):
+    fig = go.Figure()
+    for column in COLUMNS:
+        fig.add_trace(go.Scatter(x=df.index, y=df[column], mode="lines", name=column))
+    return fig
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    with figure_cache._lock:
+        figure_cache._figures.clear()
+        figure_cache._rendered.clear()
+
+
+@pytest.fixture
+def shown(monkeypatch):
+    figures = []
+    monkeypatch.setattr(utils.st, "plotly_chart", lambda fig, **kwargs: figures.append(fig))
+    return figures
+
+
+@pytest.mark.parametrize("builder", [spec_chart, validated_chart])
+@pytest.mark.parametrize("x_range", [None, (pd.Timestamp("2020-01-01"), pd.Timestamp("2021-01-01"))])
+def test_hit_renders_like_miss(builder, x_range, frame, shown):
+    misses = figure_cache.stats()["misses"]
+    utils.plotly_chart(builder(frame), x_range, use_container_width=True)
+    hits = figure_cache.stats()["hits"]
+    # Render the hit again rather than reusing what the miss rendered
+    figure_cache._rendered.clear()
+    utils.plotly_chart(builder(frame), x_range, use_container_width=True)
+    assert figure_cache.stats()["misses"] == misses + 1
+    assert figure_cache.stats()["hits"] == hits + 1
+
+    miss, hit = shown
+    # Key order aside (plotly fills the default template in lazily), the browser gets the same figure
+    assert json.loads(miss.to_json()) == json.loads(hit.to_json())
+    for trace in hit.data:
+        assert len(trace.x) == len(trace.y)
+        assert len(trace.x) <= utils.MAX_POINTS
+        if x_range is not None:
+            assert len(trace.x) <= 367
+
+
+def test_hit_is_a_copy(frame):
+    first = spec_chart(frame)
+    second = spec_chart(frame)
+    second.data[0].update(x=second.data[0].x[:10], y=second.data[0].y[:10])
+    third = spec_chart(frame)
+    assert len(third.data[0].x) == len(first.data[0].x) == len(frame)
+
+
+def test_rendered_once_per_viewport(frame, shown, monkeypatch):
+    downsampled = []
+    downsample_figure = utils.downsample_figure
+    monkeypatch.setattr(utils, "downsample_figure", lambda fig, **kwargs: (
+        downsampled.append(kwargs["x_range"]), downsample_figure(fig, **kwargs)
+    ))
+    viewport = (pd.Timestamp("2020-01-01"), pd.Timestamp("2021-01-01"))
+
+    for x_range in [None, None, viewport, viewport, None]:
+        utils.plotly_chart(spec_chart(frame), x_range)
+    assert downsampled == [None, viewport]
+    assert shown[0] is shown[1] is shown[4]
+    assert shown[2] is shown[3]
+
+    # Figures not built through figure_cache are rendered every time
+    for _ in range(2):
+        utils.plotly_chart(spec_chart.__wrapped__(frame))
+    assert downsampled == [None, viewport, None, None]
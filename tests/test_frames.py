@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+import baseline
+from chart_pages import PLOTLY_TRACES, fixture
+from frames import build_frame
+from plotly_extract import load_plotly_data
+
+
+def dates(start, days):
+    return pd.date_range(start, periods=days, freq="D").strftime("%Y-%m-%d").tolist()
+
+
+# Traces on other dates than the index trace: a later start, gaps, days past
+# its end, a string that is not a number, and a name that appears twice
+OFFSET_TRACES = [
+    {"name": "Price", "x": dates("2024-01-01", 10), "y": [float(i) for i in range(10)]},
+    {"name": "Late", "x": dates("2024-01-05", 10), "y": [10.0 + i for i in range(10)]},
+    {"name": "Sparse", "x": dates("2024-01-01", 10)[::3], "y": [1.0, None, 3.0, "n/a"]},
+    {"name": "Early", "x": dates("2023-12-25", 8), "y": list(range(8))},
+    {"name": "Late", "x": dates("2024-01-03", 4), "y": [7.0, 8.0, 9.0, 10.0]},
+    {"name": "No data"},
+]
+
+
+@pytest.mark.parametrize("traces, columns", [
+    (load_plotly_data(fixture("checkonchain.html")), {name: name.upper() for name in PLOTLY_TRACES}),
+    (load_plotly_data(fixture("checkonchain.html")), {"MVRV Ratio": "MVRV", "Price": "BTC Price"}),
+    (OFFSET_TRACES, {"Price": "Price", "Late": "Late", "Sparse": "Sparse", "Early": "Early"}),
+    (OFFSET_TRACES, {"Late": "Late", "Price": "Price"}),
+])
+def test_matches_the_per_trace_loop(traces, columns):
+    pd.testing.assert_frame_equal(build_frame(traces, columns), baseline.per_trace_frame(traces, columns))
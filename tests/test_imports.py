@@ -0,0 +1,45 @@
+import glob
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Every module the pages import; the pages themselves render as they run
+MODULES = sorted(
+    os.path.splitext(os.path.basename(path))[0]
+    for path in glob.glob(os.path.join(ROOT, "*.py"))
+    if os.path.basename(path) not in {"Hello.py", "__init__.py"} and " " not in os.path.basename(path)
+)
+
+# Fails any connection or name lookup, then imports every module in a fresh interpreter
+SCRIPT = """
+import socket
+import sys
+
+attempts = []
+
+def refuse(name):
+    def refused(*args, **kwargs):
+        attempts.append((name, args[:2]))
+        raise OSError("network access during import")
+    return refused
+
+socket.socket.connect = refuse("connect")
+socket.socket.connect_ex = refuse("connect_ex")
+socket.create_connection = refuse("create_connection")
+socket.getaddrinfo = refuse("getaddrinfo")
+
+for module in sys.argv[1:]:
+    __import__(module)
+print(attempts)
+"""
+
+
+def test_bare_import_makes_no_network_calls():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *MODULES],
+        cwd=ROOT, env=dict(os.environ), capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import moments
+import store
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2012-01-01", periods=3000, freq="D", name="Date")
+    # A drifting series, so the mean moves far from the first value
+    values = 5 + np.cumsum(rng.normal(0.01, 0.1, len(index)))
+    values[:3] = np.nan
+    values[400:450] = np.nan
+    return pd.Series(values, index=index, name="metric")
+
+
+@pytest.fixture(autouse=True)
+def empty_states(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    with moments._lock:
+        moments._states.clear()
+
+
+def assert_matches_pandas(series, name):
+    mean, std = moments.expanding_mean_std(series, name)
+    np.testing.assert_allclose(mean, series.expanding().mean().to_numpy(), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(std, series.expanding().std().to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_cold_pass_matches_pandas(series):
+    assert_matches_pandas(series, "cold")
+
+
+def test_appends_match_pandas(series):
+    for end in [1000, 1001, 1040, 2500, len(series)]:
+        assert_matches_pandas(series.iloc[:end], "appends")
+
+
+def test_appends_rewrite_the_store_in_batches(series, monkeypatch):
+    writes = []
+    write = store.write
+    monkeypatch.setattr(store, "write", lambda name, df: (writes.append(len(df)), write(name, df)))
+
+    moments.running_moments(series.iloc[:2000], "batches")
+    for end in range(2001, 2000 + moments.PERSIST_EVERY + 1):
+        moments.running_moments(series.iloc[:end], "batches")
+    assert writes == [2000, 2000 + moments.PERSIST_EVERY]
+
+
+def test_restart_folds_in_days_the_store_missed(series):
+    moments.running_moments(series.iloc[:2000], "restart")
+    moments.running_moments(series.iloc[:2010], "restart")
+    with moments._lock:
+        moments._states.clear()
+    assert len(store.read(moments._store_name("restart", series.index[0]))) == 2000
+    assert_matches_pandas(series, "restart")
+
+
+def test_changed_history_is_recomputed(series):
+    moments.running_moments(series.iloc[:2000], "changed")
+    revised = series.copy()
+    revised.iloc[1999] += 1
+    assert_matches_pandas(revised, "changed")
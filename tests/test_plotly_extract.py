@@ -0,0 +1,33 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from chart_pages import fixture
+from plotly_extract import extract_plotly_data, extract_var_traces, stream_plotly_data
+
+
+@pytest.mark.parametrize("y, expected", [
+    ("[1.5, null, 3]", [1.5, np.nan, 3.0]),
+    ("[1, true, 3]", [1.0, 1.0, 3.0]),
+    ("[1, \"n/a\", 3]", ["1", "n/a", "3"]),
+    ("[]", []),
+])
+def test_var_trace_arrays(y, expected):
+    script = f"var trace0 = {{x: [\"2024-01-01\", \"2024-01-02\", \"2024-01-03\"], y: {y}, name: 'Price'}};"
+    filters = list(warnings.filters)
+    trace, = extract_var_traces(script)
+    # Parsing must leave the process-wide warning filters alone
+    assert warnings.filters == filters
+    np.testing.assert_array_equal(trace["y"], np.array(expected, dtype=None if expected else float))
+    assert trace["x"].dtype.kind == "M"
+
+
+@pytest.mark.parametrize("page", ["checkonchain.html", "checkonchain_comment.html"])
+@pytest.mark.parametrize("names", [None, {"Price", "MVRV Ratio"}])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 64 * 1024, None])
+def test_streaming_matches_the_whole_page(page, names, chunk_size):
+    html = fixture(page)
+    chunk_size = chunk_size or len(html)
+    chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+    assert stream_plotly_data(chunks, names) == extract_plotly_data(html, names=names)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+import price_models
+from baseline import cycle_pipeline
+
+
+@pytest.fixture
+def combined_df():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("2010-07-18", periods=5000, freq="D", name="Date")
+    values = np.exp(np.cumsum(rng.normal(0.001, 0.03, (len(index), len(price_models.PRICE_COLUMNS))), axis=0))
+    # Gaps in single inputs and whole days without any, as the sources have
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[3000:3010] = np.nan
+    return pd.DataFrame(values, index=index, columns=price_models.PRICE_COLUMNS)
+
+
+def after_2012(df):
+    return df[df.index >= pd.to_datetime('2012')]
+
+
+def test_cycle_frame_matches_the_pandas_pipeline(combined_df):
+    expected = cycle_pipeline(combined_df)
+    pd.testing.assert_frame_equal(price_models.cycle_frame(after_2012(combined_df)), expected, check_exact=True)
+
+
+def test_extending_matches_a_full_build(combined_df):
+    cycles = price_models.CycleFrame()
+    frames = []
+    for end in [4000, 4001, 4040, 4800, 5000]:
+        frames.append(cycles.extend(after_2012(combined_df.iloc[:end])))
+        pd.testing.assert_frame_equal(frames[-1], cycle_pipeline(combined_df.iloc[:end]), check_exact=True)
+
+    # Appending reuses the block and leaves the frames returned before as they were
+    assert np.shares_memory(frames[1]['BTC Price'].to_numpy(), frames[2]['BTC Price'].to_numpy())
+    pd.testing.assert_frame_equal(frames[0], cycle_pipeline(combined_df.iloc[:4000]), check_exact=True)
+
+
+def test_changed_history_is_rebuilt(combined_df):
+    cycles = price_models.CycleFrame()
+    cycles.extend(after_2012(combined_df.iloc[:4000]))
+    # A revision of the last day computed means the history is not just extended
+    revised = combined_df.copy()
+    revised.iloc[3999, 0] *= 2
+    pd.testing.assert_frame_equal(cycles.extend(after_2012(revised)), cycle_pipeline(revised), check_exact=True)
+
+
+def test_intermediate_metrics_are_graph_nodes():
+    graph = metrics.graph()
+    assert graph["get_dataframe"] == ("onchain_originals",)
+    for name in ["terminal_prices", "avg_top", "avg_bot", "normalized_price", "adjusted_normalized_price"]:
+        assert graph[name] == ("get_dataframe",)
@@ -0,0 +1,81 @@
+import os
+import time
+import types
+
+import pandas as pd
+import pytest
+
+import refresher
+import store
+from chart_pages import fixture
+
+COLUMNS = {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"}
+TTL = 3600
+LEAD = 300
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(fresh_sources, monkeypatch):
+    # sources ages its copies on the same clock the refresher schedules with
+    clock = Clock()
+    monkeypatch.setattr(fresh_sources, "time", types.SimpleNamespace(
+        monotonic=clock, perf_counter=time.perf_counter, time=time.time,
+    ))
+    monkeypatch.setattr(fresh_sources, "TTL", TTL)
+    return clock
+
+
+@pytest.fixture
+def sources(fresh_sources, upstream, clock):
+    fresh_sources.SOURCES["mvrv"] = {"url": upstream.url("/mvrv"), "columns": COLUMNS}
+    upstream.routes["/mvrv"] = [{"body": fixture("checkonchain.html")}]
+    return fresh_sources
+
+
+def make_refresher(clock):
+    return refresher.Refresher(["mvrv"], lead=LEAD, retry=60, clock=clock)
+
+
+def test_reloads_before_the_ttl_runs_out(sources, upstream, clock):
+    scheduler = make_refresher(clock)
+    assert scheduler.run_pending() == TTL - LEAD
+    assert upstream.hits("/mvrv") == 1
+
+    clock.now += TTL - LEAD - 1
+    assert scheduler.run_pending() == 1
+    assert upstream.hits("/mvrv") == 1
+
+    clock.now += 1
+    assert scheduler.run_pending() == TTL - LEAD
+    assert upstream.hits("/mvrv") == 2
+    assert sources.age("mvrv") == 0
+
+
+def test_stored_copy_is_reloaded_by_its_age(sources, upstream, clock):
+    # A copy another run stored 3000 s ago is served, and is due 300 s before it expires
+    df = pd.DataFrame(
+        {"BTC Price": [1.0, 2.0], "MVRV Ratio": [1.0, 1.1]},
+        index=pd.DatetimeIndex(["2024-06-29", "2024-06-30"], name="Date"),
+    )
+    store.write("mvrv", df)
+    stored_at = time.time() - 3000
+    os.utime(store._path("mvrv"), (stored_at, stored_at))
+
+    scheduler = make_refresher(clock)
+    delay = scheduler.run_pending()
+    assert upstream.hits("/mvrv") == 0
+    assert sources.age("mvrv") == pytest.approx(3000, abs=5)
+    assert delay == pytest.approx(TTL - LEAD - 3000, abs=5)
+
+    clock.now += delay
+    scheduler.run_pending()
+    assert upstream.hits("/mvrv") == 1
+    assert sources.age("mvrv") < TTL
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from chart_pages import fixture
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"}
+
+# A Streamlit process reduced to its loader: each line on stdin names a call
+# to make on the mvrv source, and a line describing the frame comes back
+PROCESS = textwrap.dedent("""
+    import json
+    import sys
+
+    import numpy as np
+
+    import sources
+
+    sources.SOURCES = {"mvrv": {"url": sys.argv[1], "columns": json.loads(sys.argv[2])}}
+
+    def mapped(array):
+        # The memory map under array, if there is one
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return array
+            array = array.base
+        return None
+
+    for call in sys.stdin:
+        if call.strip() == "refresh":
+            sources.refresh(["mvrv"])
+        df, version = sources.load_versioned("mvrv")
+        block = mapped(df.to_numpy())
+        print(json.dumps({
+            "version": version,
+            "registry_version": sources._registry_versions["mvrv"],
+            "rows": len(df),
+            "last": str(df.index[-1].date()),
+            "mapped": block is not None,
+            "writeable": None if block is None else bool(block.flags.writeable),
+        }), flush=True)
+""")
+
+
+class Process:
+    def __init__(self, url, tmp_path, name):
+        # Processes share only the registry, so nothing reaches one through a common store or cache
+        env = {
+            **os.environ,
+            "PYTHONPATH": ROOT,
+            "ONCHAIN_REGISTRY_DIR": str(tmp_path / "registry"),
+            "ONCHAIN_STORE_DIR": str(tmp_path / name / "store"),
+            "ONCHAIN_CACHE_DIR": str(tmp_path / name / "http"),
+        }
+        self._process = subprocess.Popen(
+            [sys.executable, "-c", PROCESS, url, json.dumps(COLUMNS)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env, cwd=ROOT,
+        )
+
+    def call(self, call):
+        self._process.stdin.write(call + "\n")
+        self._process.stdin.flush()
+        line = self._process.stdout.readline()
+        assert line, "process exited"
+        return json.loads(line)
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait(timeout=30)
+
+
+@pytest.fixture
+def processes(upstream, tmp_path):
+    upstream.routes["/mvrv"] = [{"body": fixture("checkonchain.html")}]
+    started = []
+
+    def start(name):
+        started.append(Process(upstream.url("/mvrv"), tmp_path, name))
+        return started[-1]
+
+    yield start
+    for process in started:
+        process.close()
+
+
+def test_attaches_to_another_process_without_fetching(processes, upstream):
+    publisher = processes("publisher")
+    published = publisher.call("load")
+    assert published["registry_version"] == 1 and published["rows"] == 400
+    assert upstream.hits("/mvrv") == 1
+
+    attacher = processes("attacher")
+    attached = attacher.call("load")
+    assert upstream.hits("/mvrv") == 1
+    assert attached["registry_version"] == 1 and attached["rows"] == 400
+    assert attached["mapped"] and attached["writeable"] is False
+
+    # The publisher reloads a day later; the attacher picks the new version up without fetching it
+    upstream.routes["/mvrv"] = [{"body": fixture("checkonchain_next_day.html")}]
+    assert publisher.call("refresh")["registry_version"] == 2
+    assert upstream.hits("/mvrv") == 2
+
+    attached = attacher.call("refresh")
+    assert upstream.hits("/mvrv") == 2
+    assert attached["registry_version"] == 2 and attached["version"] == 2
+    assert attached["rows"] == 401 and attached["last"] == "2024-07-01"
+    assert attached["mapped"] and attached["writeable"] is False
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+import fetch
+from chart_pages import fixture
+
+SOURCES = {
+    "checkonchain": {
+        "columns": {"Price": "BTC Price", "MVRV Ratio": "MVRV Ratio"},
+    },
+    "chainexposed": {
+        "format": "var_trace",
+        "columns": {"Price": "Price", "1m to 3m": "1m to 3m"},
+    },
+}
+
+
+def page(name, etag):
+    # A fixture page that answers a request revalidating etag with a 304
+    body = fixture(name)
+
+    def respond(headers):
+        if headers.get("If-None-Match") == etag:
+            return {"status": 304, "headers": {"ETag": etag}}
+        return {"body": body, "headers": {"ETag": etag, "Content-Type": "text/html; charset=utf-8"}}
+
+    return respond
+
+
+@pytest.fixture
+def serve(upstream, fresh_sources):
+    # Point the named source at the upstream, serving the given pages in turn
+    def serve(name, *pages):
+        fresh_sources.SOURCES[name] = {**SOURCES[name], "url": upstream.url(f"/{name}")}
+        upstream.routes[f"/{name}"] = list(pages)
+        return fresh_sources
+
+    return serve
+
+
+def refresh(sources, name):
+    assert sources.refresh([name]) == {name: None}
+    return sources.load_versioned(name)
+
+
+@pytest.mark.parametrize("name, html", [("checkonchain", "checkonchain.html"), ("chainexposed", "chainexposed.html")])
+def test_unchanged_body_is_not_parsed(serve, upstream, name, html):
+    sources = serve(name, page(html, '"v1"'))
+    df, version = refresh(sources, name)
+    assert len(df) == 400 and version == 1
+
+    hits = fetch.cache_stats()["hits"]
+    assert refresh(sources, name) == (df, 1)
+    assert fetch.cache_stats()["hits"] == hits + 1
+    assert upstream.requests[-1][1].get("If-None-Match") == '"v1"'
+    assert sources.digests()[name]["skips"] == {"body": 1, "payload": 0}
+    assert len(sources.changes(name)) == 0
+
+
+def test_comment_only_change_is_not_parsed(serve, upstream, monkeypatch):
+    sources = serve(
+        "checkonchain",
+        page("checkonchain.html", '"v1"'),
+        page("checkonchain_comment.html", '"v2"'),
+    )
+    df, _ = refresh(sources, "checkonchain")
+    body_digest = sources.digests()["checkonchain"]["body"]
+
+    # The payload is the same, so not a single trace may be decoded
+    def decode(*args, **kwargs):
+        raise AssertionError("payload decoded")
+
+    monkeypatch.setattr(sources, "decode_plotly_payload", decode)
+    assert refresh(sources, "checkonchain") == (df, 1)
+    assert sources.digests()["checkonchain"]["body"] != body_digest
+    assert sources.digests()["checkonchain"]["skips"] == {"body": 0, "payload": 1}
+
+
+def test_data_change_is_parsed(serve):
+    sources = serve(
+        "checkonchain",
+        page("checkonchain.html", '"v1"'),
+        page("checkonchain_next_day.html", '"v2"'),
+    )
+    df, _ = refresh(sources, "checkonchain")
+    digests = sources.digests()["checkonchain"]
+
+    updated, version = refresh(sources, "checkonchain")
+    assert version == 2
+    assert len(updated) == 401
+    assert list(sources.changes("checkonchain")) == [pd.Timestamp("2024-07-01")]
+    pd.testing.assert_frame_equal(updated.iloc[:400], df)
+    assert sources.digests()["checkonchain"]["payload"] != digests["payload"]
+    assert sources.digests()["checkonchain"]["skips"] == {"body": 0, "payload": 0}
@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import pytest
+
+import baseline
+from webgl import apply_render_mode
+
+
+def scatter(points, **properties):
+    x = pd.date_range("2012-01-01", periods=points, freq="D")
+    return go.Scatter(x=x, y=np.arange(points, dtype=float), **properties)
+
+
+@pytest.fixture
+def fig():
+    return go.Figure([
+        scatter(2000, name="large", mode="lines", line=dict(color="red", width=1)),
+        scatter(10, name="small", mode="lines"),
+        scatter(2000, name="spline", line=dict(shape="spline")),
+        scatter(2000, name="smoothed", line=dict(smoothing=0.5)),
+        scatter(2000, name="stacked", stackgroup="one"),
+        scatter(2000, name="gradient", mode="markers", marker=dict(gradient=dict(type="radial"))),
+        go.Bar(x=[1, 2], y=[3, 4], name="bar"),
+    ], layout=dict(yaxis_type="log"))
+
+
+@pytest.mark.parametrize("mode", ["auto", "always", "never"])
+def test_matches_the_validated_conversion(fig, mode):
+    expected = baseline.apply_render_mode(go.Figure(fig), mode)
+    shown = apply_render_mode(fig, mode)
+    assert json.loads(shown.to_json()) == json.loads(expected.to_json())
+
+
+def test_only_what_webgl_draws_is_converted(fig):
+    types = {trace.name: trace.type for trace in apply_render_mode(fig, "auto").data}
+    assert types == {
+        "large": "scattergl", "small": "scatter", "spline": "scatter", "smoothed": "scatter",
+        "stacked": "scatter", "gradient": "scatter", "bar": "bar",
+    }
+
+
+def test_nothing_to_convert_returns_the_figure(fig):
+    small = go.Figure([scatter(10)])
+    assert apply_render_mode(small, "auto") is small
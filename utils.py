@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import inspect
 import textwrap
 
+import pandas as pd
 import streamlit as st
 
+import figure_cache
+from downsample import MAX_POINTS, downsample_figure
+from webgl import WEBGL, apply_render_mode
+
 
 def show_code(demo):
     """Showing the code of the demo."""
@@ -26,3 +32,34 @@ def show_code(demo):
         st.markdown("## Code")
         sourcelines, _ = inspect.getsourcelines(demo)
         st.code(textwrap.dedent("".join(sourcelines[1:])))
+
+
+
+def viewport():
+    """Let the user pick the date range every chart on the page shows."""
+    picked = st.sidebar.date_input(
+        "Date range",
+        value=(datetime.date(2012, 1, 1), datetime.date.today()),
+    )
+    # Nothing picked shows everything; while the second date is being picked
+    # only the first one is returned
+    if not picked:
+        return None
+    if len(picked) < 2:
+        return pd.Timestamp(picked[0]), pd.Timestamp.today()
+    return pd.Timestamp(picked[0]), pd.Timestamp(picked[1]) + pd.Timedelta(days=1)
+
+
+def plotly_chart(fig, x_range=None, n_out=MAX_POINTS, webgl=WEBGL, **kwargs):
+    """Show fig with every trace trimmed to x_range and downsampled to n_out points.
+
+    Narrowing x_range shows the full-resolution data again once it holds
+    fewer than n_out points. webgl is "auto", "always" or "never" and decides
+    which traces are drawn with WebGL instead of SVG.
+    """
+    def render(fig):
+        # figure_cache hands every call its own copy, so trimming it in place is safe
+        downsample_figure(fig, n_out=n_out, x_range=x_range)
+        return apply_render_mode(fig, webgl)
+
+    st.plotly_chart(figure_cache.rendered(fig, (x_range, n_out, webgl), render), **kwargs)
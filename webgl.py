@@ -0,0 +1,56 @@
+import os
+
+import plotly.graph_objs as go
+from plotly.validator_cache import ValidatorCache
+
+# "auto" draws traces with at least WEBGL_MIN_POINTS points with WebGL and the
+# rest as SVG, "always" and "never" force one or the other
+WEBGL = os.environ.get("ONCHAIN_WEBGL", "auto")
+
+# Below this many points SVG draws as fast and looks crisper than WebGL
+WEBGL_MIN_POINTS = int(os.environ.get("ONCHAIN_WEBGL_MIN_POINTS", 1000))
+
+
+# What Scattergl can draw, read from Plotly's own classes: spline lines, stacking,
+# fill patterns and the like are SVG only
+_GL_PROPERTIES = frozenset(go.Scattergl()._valid_props)
+_GL_LINE_PROPERTIES = frozenset(go.scattergl.Line()._valid_props)
+_GL_MARKER_PROPERTIES = frozenset(go.scattergl.Marker()._valid_props)
+_GL_LINE_SHAPES = frozenset(ValidatorCache.get_validator('scattergl.line', 'shape').values)
+
+
+def _to_scattergl(trace):
+    # Returns the trace as a Scattergl dict, or None if it uses anything only SVG draws
+    properties = trace.to_plotly_json()
+    line = properties.get('line', {})
+    if (
+        not properties.keys() <= _GL_PROPERTIES | {'type'}
+        or not line.keys() <= _GL_LINE_PROPERTIES
+        or line.get('shape', 'linear') not in _GL_LINE_SHAPES
+        or not properties.get('marker', {}).keys() <= _GL_MARKER_PROPERTIES
+    ):
+        return None
+    properties['type'] = 'scattergl'
+    return properties
+
+
+def apply_render_mode(fig, mode=WEBGL, min_points=WEBGL_MIN_POINTS):
+    """Return fig with its large scatter traces drawn with WebGL according to mode."""
+    if mode == "never":
+        return fig
+
+    data = []
+    converted = False
+    for trace in fig.data:
+        properties = None
+        if trace.type == 'scatter' and (
+            mode == "always" or (trace.x is not None and len(trace.x) >= min_points)
+        ):
+            properties = _to_scattergl(trace)
+        converted = converted or properties is not None
+        data.append(trace.to_plotly_json() if properties is None else properties)
+
+    if not converted:
+        return fig
+    # The traces only change type, so Plotly's validation is skipped as in figure_spec
+    return go.Figure(dict(data=data, layout=fig.layout.to_plotly_json()), _validate=False)